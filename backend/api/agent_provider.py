@@ -157,7 +157,7 @@ class AWSBedrockAgentProvider(AgentProvider):
 
         # ✅ 注册查询到 registry
         if cancel_event:
-            await self._query_registry.register(query_id, session_id, cancel_event)
+            self._query_registry.register(query_id, session_id, cancel_event)
 
         try:
             # 并发查询限制检查
@@ -453,14 +453,21 @@ class AWSBedrockAgentProvider(AgentProvider):
                     doc_extensions = {".pdf", ".doc", ".docx", ".md", ".markdown", ".txt"}
                     return any(f.file_name.lower().endswith(ext) for ext in doc_extensions)
 
-                def get_base64_size(base64_data: str, file_name: str) -> int:
-                    """安全获取 base64 数据大小（字节），失败返回 0"""
+                def get_base64_size(att) -> int:
+                    """安全获取附件大小（字节），失败返回 0
+
+                    ImageData 在请求校验阶段已解码并缓存 size_bytes，这里直接复用，
+                    避免对 MB 级 base64 数据再次解码。
+                    """
                     try:
-                        return len(base64.b64decode(base64_data))
+                        size = getattr(att, "size_bytes", None)
+                        if size is None:
+                            size = len(base64.b64decode(att.base64_data))
+                        return size
                     except Exception as e:
                         logger.warning(
                             "附件 base64 解码失败 - file_name: %s, error: %s",
-                            file_name,
+                            att.file_name,
                             e,
                         )
                         return 0
@@ -468,20 +475,20 @@ class AWSBedrockAgentProvider(AgentProvider):
                 attachments_metadata = {
                     "images": [
                         {"id": str(uuid.uuid4()), "fileName": img.file_name,
-                         "fileSize": get_base64_size(img.base64_data, img.file_name),
+                         "fileSize": get_base64_size(img),
                          "mimeType": img.mime_type}
                         for img in (images or [])
                     ],
                     "excels": [
                         {"id": str(uuid.uuid4()), "fileName": f.file_name,
-                         "fileSize": get_base64_size(f.base64_data, f.file_name),
+                         "fileSize": get_base64_size(f),
                          "mimeType": f.mime_type}
                         for f in (files or [])
                         if f.mime_type in EXCEL_TYPES or f.file_name.lower().endswith((".xlsx", ".xls"))
                     ],
                     "documents": [
                         {"id": str(uuid.uuid4()), "fileName": f.file_name,
-                         "fileSize": get_base64_size(f.base64_data, f.file_name),
+                         "fileSize": get_base64_size(f),
                          "mimeType": f.mime_type}
                         for f in (files or [])
                         if is_document(f)
@@ -776,18 +783,18 @@ class AWSBedrockAgentProvider(AgentProvider):
             }
         finally:
             # ✅ 查询结束时自动清理
-            await self._query_registry.unregister(query_id)
+            self._query_registry.unregister(query_id)
             logger.info("查询资源已清理 - QueryID: %s", query_id)
 
     async def cancel(self, query_id: str) -> bool:
         """取消查询"""
-        info = await self._query_registry.get(query_id)
+        info = self._query_registry.get(query_id)
         if not info:
             logger.warning("[AgentProvider] 未找到查询 - QueryID: %s", query_id)
             return False
 
         # 设置取消标志
-        await self._query_registry.cancel(query_id)
+        self._query_registry.cancel(query_id)
 
         # 停止 AWS Bedrock Session
         if info.session_id:
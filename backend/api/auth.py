@@ -18,7 +18,7 @@ from backend.utils.auth import (
     create_refresh_token,
     decode_access_token,
     get_current_user,
-    hash_password,
+    hash_password_async,
     verify_password,
 )
 
@@ -210,7 +210,7 @@ async def register(register_request: RegisterRequest, request: Request):
                 org_id=organization["id"],
                 username=register_request.email,
                 email=register_request.email,
-                password_hash=hash_password(register_request.password),
+                password_hash=await hash_password_async(register_request.password),
                 full_name=register_request.full_name,
                 role="admin",
                 db=db,
@@ -668,7 +668,7 @@ async def activate_account(request_body: ActivateAccountRequest):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
         # 3. 更新用户（设置密码、激活账号、验证邮箱）
-        user_storage.update_password(user_id, hash_password(request_body.password))
+        user_storage.update_password(user_id, await hash_password_async(request_body.password))
         user_storage.update_user(user_id, is_active=True)
 
         # 更新 email_verified_at（直接操作数据库）
@@ -683,6 +683,7 @@ async def activate_account(request_body: ActivateAccountRequest):
             {"now": datetime.now(UTC), "user_id": user_id},
         )
         db.commit()
+        user_storage.invalidate_user_cache(user_id)
 
         # 4. 标记Token为已使用
         verification_service.mark_activation_used(activation_id)
@@ -948,7 +949,7 @@ async def reset_password(request_body: ResetPasswordRequest, request: Request):
             )
 
         # 3. 更新密码
-        user_storage.update_password(user["id"], hash_password(request_body.new_password))
+        user_storage.update_password(user["id"], await hash_password_async(request_body.new_password))
 
         logger.info(f"✅ 密码重置成功 - user_id: {user['id']}, email: {email}")
 
@@ -10,6 +10,9 @@ from ..utils.auth import get_current_user
 
 router = APIRouter()
 
+# 模型列表在导入时固定，序列化结果只需计算一次
+_MODELS_PAYLOAD: list[dict] = [m.model_dump() for m in AVAILABLE_MODELS]
+
 
 @router.get("/api/models")
 async def get_available_models(
@@ -24,4 +27,4 @@ async def get_available_models(
             - description: i18n 翻译 key
             - is_default: 是否为默认模型
     """
-    return [m.model_dump() for m in AVAILABLE_MODELS]
+    return _MODELS_PAYLOAD
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field, field_validator
 
 from backend.services.user_storage import get_user_storage
-from backend.utils.auth import get_current_user, hash_password, verify_password
+from backend.utils.auth import get_current_user, hash_password_async, verify_password
 
 router = APIRouter(prefix="/api/profile", tags=["个人信息"])
 
@@ -46,6 +46,6 @@ async def change_password(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前密码不正确")
 
     # 更新密码
-    user_storage.update_password(current_user["id"], hash_password(request.new_password))
+    user_storage.update_password(current_user["id"], await hash_password_async(request.new_password))
 
     return {"message": "密码修改成功，请使用新密码重新登录"}
@@ -3,17 +3,11 @@
 提供提示词模板的 CRUD 操作和执行功能
 """
 
-import json
 import uuid
-from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-
-
-def _utc_now() -> datetime:
-    """返回当前 UTC 时间"""
-    return datetime.now(timezone.utc)
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 
 from ..database import get_db
 from ..models.prompt_template import (
@@ -35,11 +29,33 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["Prompt Templates"])
 
 
+# ========== 列定义 ==========
+
+# 显式列出与 Pydantic 响应模型对应的列，避免 SELECT * 拉取多余列
+# 注：前端列表页直接使用 prompt_text 发送/复制模板，因此列表查询保留该列
+_TEMPLATE_COLS = (
+    "id, title, description, prompt_text, category, icon, cloud_provider, "
+    "variables, usage_count, is_active, display_order, created_at, updated_at"
+)
+_USER_TEMPLATE_COLS = (
+    "id, user_id, title, description, prompt_text, category, "
+    "variables, is_favorite, usage_count, created_at, updated_at"
+)
+_SLASH_COMMAND_COLS = "command, template_id, description, is_active, created_at"
+
+
+# variables 列为 JSONB：直接绑定 Python list，由驱动编码；None 写入 SQL NULL 而非 JSON null
+_VARIABLES_PARAM = bindparam("variables", type_=JSONB(none_as_null=True))
+
+
 # ========== 辅助函数 ==========
 
 
 def convert_row_to_dict(row):
-    """将数据库行转换为字典，处理 UUID 类型"""
+    """将数据库行转换为字典，处理 UUID 类型
+
+    variables 为 JSONB 列，驱动已解码为 list/dict，无需再 json.loads。
+    """
     row_dict = dict(row._mapping)
     # 将 UUID 对象转换为字符串
     for key, value in row_dict.items():
@@ -61,7 +77,7 @@ async def get_system_templates(
 ):
     """获取系统预设模板列表"""
     try:
-        query = "SELECT * FROM prompt_templates WHERE is_active = TRUE"
+        query = f"SELECT {_TEMPLATE_COLS} FROM prompt_templates WHERE is_active = TRUE"
         params = {}
 
         if category:
@@ -76,17 +92,7 @@ async def get_system_templates(
 
         result = db.execute(text(query), params)
         rows = result.fetchall()
-        templates = []
-
-        for row in rows:
-            row_dict = convert_row_to_dict(row)
-            # 解析 JSON 变量字段
-            if row_dict.get("variables"):
-                try:
-                    row_dict["variables"] = json.loads(row_dict["variables"])
-                except:
-                    row_dict["variables"] = None
-            templates.append(row_dict)
+        templates = [convert_row_to_dict(row) for row in rows]
 
         logger.info(
             f"✅ 获取系统模板成功 - Category: {category}, Cloud: {cloud_provider}, Count: {len(templates)}"
@@ -103,7 +109,7 @@ async def get_system_template(template_id: str, db=Depends(get_db)):
     """获取单个系统模板详情"""
     try:
         result = db.execute(
-            text("SELECT * FROM prompt_templates WHERE id = :template_id"),
+            text(f"SELECT {_TEMPLATE_COLS} FROM prompt_templates WHERE id = :template_id"),
             {"template_id": template_id},
         )
         row = result.fetchone()
@@ -112,11 +118,6 @@ async def get_system_template(template_id: str, db=Depends(get_db)):
             raise HTTPException(status_code=404, detail="模板不存在")
 
         row_dict = convert_row_to_dict(row)
-        if row_dict.get("variables"):
-            try:
-                row_dict["variables"] = json.loads(row_dict["variables"])
-            except:
-                row_dict["variables"] = None
 
         logger.info("- ID: %s", template_id)
         return row_dict
@@ -140,9 +141,9 @@ async def execute_template(
 ):
     """执行模板（渲染变量并增加使用计数）"""
     try:
-        # 查找系统模板
+        # 查找系统模板（渲染只需要 prompt_text 和 usage_count）
         result = db.execute(
-            text("SELECT * FROM prompt_templates WHERE id = :template_id"),
+            text("SELECT prompt_text, usage_count FROM prompt_templates WHERE id = :template_id"),
             {"template_id": template_id},
         )
         row = result.fetchone()
@@ -153,7 +154,8 @@ async def execute_template(
         if not row:
             result = db.execute(
                 text(
-                    "SELECT * FROM user_prompt_templates WHERE id = :template_id AND user_id = :user_id"
+                    "SELECT prompt_text, usage_count FROM user_prompt_templates "
+                    "WHERE id = :template_id AND user_id = :user_id"
                 ),
                 {"template_id": template_id, "user_id": current_user["id"]},
             )
@@ -205,7 +207,10 @@ async def get_slash_commands(db=Depends(get_db)):
     """获取斜杠命令列表"""
     try:
         result = db.execute(
-            text("SELECT * FROM slash_commands WHERE is_active = TRUE ORDER BY command ASC")
+            text(
+                f"SELECT {_SLASH_COMMAND_COLS} FROM slash_commands "
+                "WHERE is_active = TRUE ORDER BY command ASC"
+            )
         )
         rows = result.fetchall()
         commands = [convert_row_to_dict(row) for row in rows]
@@ -228,7 +233,7 @@ async def get_user_templates(
 ):
     """获取用户自定义模板列表"""
     try:
-        query = "SELECT * FROM user_prompt_templates WHERE user_id = :user_id"
+        query = f"SELECT {_USER_TEMPLATE_COLS} FROM user_prompt_templates WHERE user_id = :user_id"
         params = {"user_id": current_user["id"]}
 
         if only_favorites:
@@ -238,16 +243,7 @@ async def get_user_templates(
 
         result = db.execute(text(query), params)
         rows = result.fetchall()
-        templates = []
-
-        for row in rows:
-            row_dict = convert_row_to_dict(row)
-            if row_dict.get("variables"):
-                try:
-                    row_dict["variables"] = json.loads(row_dict["variables"])
-                except:
-                    row_dict["variables"] = None
-            templates.append(row_dict)
+        templates = [convert_row_to_dict(row) for row in rows]
         logger.info("- User: %s, Count: {len(templates)}", current_user['id'])
         return templates
 
@@ -271,19 +267,17 @@ async def create_user_template(
         # validate_template(template.prompt_text)
 
         template_id = str(uuid.uuid4())
-        now = _utc_now().isoformat()
 
-        # 序列化变量为 JSON
-        variables_json = None
-        if template.variables:
-            variables_json = json.dumps([v.dict() for v in template.variables])
+        variables = [v.model_dump() for v in template.variables] if template.variables else None
 
-        db.execute(
-            text("""
+        # created_at / updated_at 由数据库 DEFAULT now() 填充
+        result = db.execute(
+            text(f"""
             INSERT INTO user_prompt_templates
-            (id, user_id, title, description, prompt_text, category, variables, created_at, updated_at)
-            VALUES (:id, :user_id, :title, :description, :prompt_text, :category, :variables, :created_at, :updated_at)
-        """),
+            (id, user_id, title, description, prompt_text, category, variables)
+            VALUES (:id, :user_id, :title, :description, :prompt_text, :category, :variables)
+            RETURNING {_USER_TEMPLATE_COLS}
+        """).bindparams(_VARIABLES_PARAM),
             {
                 "id": template_id,
                 "user_id": current_user["id"],
@@ -291,24 +285,12 @@ async def create_user_template(
                 "description": template.description,
                 "prompt_text": template.prompt_text,
                 "category": template.category,
-                "variables": variables_json,
-                "created_at": now,
-                "updated_at": now,
+                "variables": variables,
             },
         )
-        db.commit()
-
-        # 返回创建的模板
-        result = db.execute(
-            text("SELECT * FROM user_prompt_templates WHERE id = :id"), {"id": template_id}
-        )
         row = result.fetchone()
+        db.commit()
         row_dict = convert_row_to_dict(row)
-        if row_dict.get("variables"):
-            try:
-                row_dict["variables"] = json.loads(row_dict["variables"])
-            except:
-                row_dict["variables"] = None
 
         logger.info(
             f"✅ 创建用户模板成功 - User: {current_user['id']}, Template: {template_id}, Title: {template.title}"
@@ -331,19 +313,9 @@ async def update_user_template(
 ):
     """更新用户自定义模板"""
     try:
-        # 检查模板是否存在且属于当前用户
-        result = db.execute(
-            text("SELECT * FROM user_prompt_templates WHERE id = :id AND user_id = :user_id"),
-            {"id": template_id, "user_id": current_user["id"]},
-        )
-        existing = result.fetchone()
-
-        if not existing:
-            raise HTTPException(status_code=404, detail="模板不存在或无权限访问")
-
-        # 构建更新语句
+        # 构建更新语句（所有权校验并入 UPDATE 的 WHERE 条件）
         update_fields = []
-        params = {"id": template_id}
+        params = {"id": template_id, "user_id": current_user["id"]}
 
         if template.title is not None:
             update_fields.append("title = :title")
@@ -363,39 +335,33 @@ async def update_user_template(
             params["category"] = template.category
 
         if template.variables is not None:
-            variables_json = (
-                json.dumps([v.dict() for v in template.variables]) if template.variables else None
-            )
             update_fields.append("variables = :variables")
-            params["variables"] = variables_json
+            params["variables"] = (
+                [v.model_dump() for v in template.variables] if template.variables else None
+            )
 
-        # 更新时间
-        now = _utc_now().isoformat()
-        update_fields.append("updated_at = :updated_at")
-        params["updated_at"] = now
+        # 更新时间（由数据库服务端时钟生成）
+        update_fields.append("updated_at = now()")
 
-        # 执行更新
-        db.execute(
-            text(f"""
+        # 执行更新：一次往返同时完成所有权校验、更新和返回结果
+        stmt = text(f"""
             UPDATE user_prompt_templates
             SET {", ".join(update_fields)}
-            WHERE id = :id
-        """),
-            params,
-        )
-        db.commit()
+            WHERE id = :id AND user_id = :user_id
+            RETURNING {_USER_TEMPLATE_COLS}
+        """)
+        if "variables" in params:
+            stmt = stmt.bindparams(_VARIABLES_PARAM)
 
-        # 返回更新后的模板
-        result = db.execute(
-            text("SELECT * FROM user_prompt_templates WHERE id = :id"), {"id": template_id}
-        )
+        result = db.execute(stmt, params)
         row = result.fetchone()
+
+        if not row:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="模板不存在或无权限访问")
+
+        db.commit()
         row_dict = convert_row_to_dict(row)
-        if row_dict.get("variables"):
-            try:
-                row_dict["variables"] = json.loads(row_dict["variables"])
-            except:
-                row_dict["variables"] = None
 
         logger.info("- User: %s, Template: %s", current_user['id'], template_id)
         return row_dict
@@ -413,18 +379,16 @@ async def delete_user_template(
 ):
     """删除用户自定义模板"""
     try:
-        # 检查模板是否存在且属于当前用户
+        # 删除模板（所有权校验并入 DELETE 的 WHERE 条件）
         result = db.execute(
-            text("SELECT * FROM user_prompt_templates WHERE id = :id AND user_id = :user_id"),
+            text("DELETE FROM user_prompt_templates WHERE id = :id AND user_id = :user_id"),
             {"id": template_id, "user_id": current_user["id"]},
         )
-        existing = result.fetchone()
 
-        if not existing:
+        if result.rowcount == 0:
+            db.rollback()
             raise HTTPException(status_code=404, detail="模板不存在或无权限访问")
 
-        # 删除模板
-        db.execute(text("DELETE FROM user_prompt_templates WHERE id = :id"), {"id": template_id})
         db.commit()
         logger.info("- User: %s, Template: %s", current_user['id'], template_id)
         return None
@@ -442,33 +406,24 @@ async def toggle_user_template_favorite(
 ):
     """切换用户模板的收藏状态"""
     try:
-        # 检查模板是否存在且属于当前用户
+        # 切换收藏状态：所有权校验、取反和更新时间在一条语句内完成
         result = db.execute(
             text(
-                "SELECT is_favorite FROM user_prompt_templates WHERE id = :id AND user_id = :user_id"
+                "UPDATE user_prompt_templates "
+                "SET is_favorite = NOT COALESCE(is_favorite, FALSE), updated_at = now() "
+                "WHERE id = :id AND user_id = :user_id "
+                "RETURNING is_favorite"
             ),
             {"id": template_id, "user_id": current_user["id"]},
         )
         row = result.fetchone()
 
         if not row:
+            db.rollback()
             raise HTTPException(status_code=404, detail="模板不存在或无权限访问")
 
-        # 切换收藏状态
-        current_favorite = row[0]  # is_favorite 是第一列
-        new_favorite = False if current_favorite else True
-
-        db.execute(
-            text(
-                "UPDATE user_prompt_templates SET is_favorite = :is_favorite, updated_at = :updated_at WHERE id = :id"
-            ),
-            {
-                "is_favorite": new_favorite,
-                "updated_at": _utc_now().isoformat(),
-                "id": template_id,
-            },
-        )
         db.commit()
+        new_favorite = row[0]  # is_favorite 是第一列
         logger.info(
             f"✅ 切换收藏成功 - User: {current_user['id']}, Template: {template_id}, Favorite: {new_favorite}"
         )
@@ -3,6 +3,7 @@
 import asyncio
 import time
 from dataclasses import dataclass
+from itertools import islice
 
 import logging
 
@@ -18,62 +19,63 @@ class QueryInfo:
 
 
 class QueryRegistry:
-    """查询注册表 - 轻量级状态管理"""
+    """查询注册表 - 轻量级状态管理
+
+    所有方法都在同一个事件循环中调用，且内部没有 await 点，
+    dict 操作与 Event.set() 在单线程事件循环内天然原子，因此无需加锁。
+    """
     
     def __init__(self):
         self._queries: dict[str, QueryInfo] = {}
-        self._lock = asyncio.Lock()
     
-    async def register(
+    def register(
         self, 
         query_id: str, 
         session_id: str | None, 
         cancel_event: asyncio.Event
     ) -> None:
         """注册查询"""
-        async with self._lock:
-            self._queries[query_id] = QueryInfo(
-                session_id=session_id,
-                cancel_event=cancel_event,
-                created_at=time.time()
-            )
-            logger.info("[QueryRegistry] - QueryID: %s, SessionID: %s", query_id, session_id)
+        self._queries[query_id] = QueryInfo(
+            session_id=session_id,
+            cancel_event=cancel_event,
+            created_at=time.time()
+        )
+        logger.info("[QueryRegistry] - QueryID: %s, SessionID: %s", query_id, session_id)
     
-    async def get(self, query_id: str) -> QueryInfo | None:
+    def get(self, query_id: str) -> QueryInfo | None:
         """获取查询信息"""
-        async with self._lock:
-            return self._queries.get(query_id)
+        return self._queries.get(query_id)
     
-    async def cancel(self, query_id: str) -> bool:
+    def cancel(self, query_id: str) -> bool:
         """取消查询"""
-        async with self._lock:
-            if query_id not in self._queries:
-                logger.warning("[QueryRegistry] - QueryID: %s", query_id)
-                return False
-            
-            info = self._queries[query_id]
-            info.cancel_event.set()
-            logger.info("[QueryRegistry] - QueryID: %s", query_id)
-            return True
+        info = self._queries.get(query_id)
+        if info is None:
+            logger.warning("[QueryRegistry] - QueryID: %s", query_id)
+            return False
+        
+        info.cancel_event.set()
+        logger.info("[QueryRegistry] - QueryID: %s", query_id)
+        return True
     
-    async def unregister(self, query_id: str) -> None:
+    def unregister(self, query_id: str) -> None:
         """注销查询"""
-        async with self._lock:
-            if query_id in self._queries:
-                del self._queries[query_id]
-                logger.info("[QueryRegistry] - QueryID: %s", query_id)
+        if self._queries.pop(query_id, None) is not None:
+            logger.info("[QueryRegistry] - QueryID: %s", query_id)
     
-    async def get_session_id(self, query_id: str) -> str | None:
+    def get_session_id(self, query_id: str) -> str | None:
         """获取查询的 session_id"""
-        async with self._lock:
-            info = self._queries.get(query_id)
-            return info.session_id if info else None
+        info = self._queries.get(query_id)
+        return info.session_id if info else None
     
-    def get_stats(self) -> dict:
-        """获取统计信息"""
+    def get_stats(self, sample: int = 0) -> dict:
+        """获取统计信息
+
+        Args:
+            sample: 返回的 query_id 样本数量，默认 0（不返回，避免每次抓取都复制全部 key）
+        """
         return {
             "active_queries": len(self._queries),
-            "query_ids": list(self._queries.keys())
+            "query_ids": list(islice(self._queries, sample)) if sample > 0 else [],
         }
 
 
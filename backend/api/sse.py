@@ -3,13 +3,13 @@
 import asyncio
 import base64
 import json
+import secrets
 import time
-import uuid
 from typing import Optional
 
 from fastapi import Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 
 from ..api.agent_provider import get_agent_provider
 from ..utils.auth import get_current_user
@@ -30,6 +30,8 @@ logger = logging.getLogger(__name__)
 # 规范: 附件数量无限制，总大小不超过 30MB
 _MAX_ATTACHMENTS = float('inf')  # 无限制
 _MAX_TOTAL_SIZE_MB = 30
+# SSE 帧缓冲上限：客户端消费变慢时生产者在 queue.put 处等待，保持背压
+_SSE_QUEUE_MAXSIZE = 64
 _ALLOWED_MIME_TYPES = {
     # 图片
     "image/jpeg",
@@ -55,6 +57,15 @@ class ImageData(BaseModel):
     mime_type: str = Field(..., description="MIME 类型")
     base64_data: str = Field(..., description="Base64 编码数据（不含 data URI 前缀）")
 
+    _size_bytes: int | None = PrivateAttr(default=None)
+
+    @property
+    def size_bytes(self) -> int:
+        """解码后的字节数（首次访问时解码并缓存，后续校验/元数据构建不再重复解码）"""
+        if self._size_bytes is None:
+            self._size_bytes = len(base64.b64decode(self.base64_data))
+        return self._size_bytes
+
 
 class SSEQueryRequestV2(BaseModel):
     """SSE 查询请求 V2"""
@@ -134,8 +145,7 @@ class SSEQueryRequestV2(BaseModel):
 
         for att in all_attachments:
             try:
-                size = len(base64.b64decode(att.base64_data))
-                total_size += size
+                total_size += att.size_bytes
             except Exception:
                 raise ValueError(f"文件 {att.file_name} 的 base64 数据无效")
 
@@ -194,7 +204,7 @@ async def sse_query_endpoint_v2(
     username = current_user.get("username", "Unknown")
 
     # 生成 query_id（如果未提供）
-    query_id = query_request.query_id or f"query_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+    query_id = query_request.query_id or f"query_{time.time_ns() // 1_000_000}_{secrets.token_hex(4)}"
 
     # 解析账号ID列表
     account_ids_list = query_request.account_ids or []
@@ -289,8 +299,8 @@ async def sse_query_endpoint_v2(
         #    - 这些变量都来自 `sse_query_endpoint_v2()`，通过闭包可以自然访问
         #
         # 3. **生命周期绑定**：
-        #    - `watch_disconnect()` 的生命周期与 `generate()` 绑定
-        #    - 当 `generate()` 结束时，`watch_disconnect()` 任务也会被取消
+        #    - `watch_disconnect()` 与生产者都是 `generate()` 创建的后台任务
+        #    - 当 `generate()` 结束或被关闭时，在 finally 中统一取消并等待两个任务
         #    - 这样确保了资源不会泄漏
         #
         # ✅ 后台任务：监控连接断开
@@ -320,55 +330,67 @@ async def sse_query_endpoint_v2(
             except Exception as e:
                 logger.warning("[] : %s", e)
 
-        # ✅ 启动后台监控任务
+        # ✅ 生产者：驱动 agent_provider.query()，把 SSE 帧放入队列
+        async def produce():
+            try:
+                agent_provider = get_agent_provider()
+                async for event in agent_provider.query(
+                    query_id=query_id,
+                    query=query_request.query,
+                    user_id=user_id,
+                    org_id=org_id,
+                    role=role,
+                    username=username,
+                    account_ids=account_ids_list,
+                    gcp_account_ids=gcp_account_ids_list,
+                    session_id=query_request.session_id,
+                    model_id=query_request.model_id,
+                    cancel_event=cancel_event,
+                    images=query_request.images,
+                    files=query_request.files,
+                ):
+                    # ✅ 在每次输出前检查取消标志
+                    if cancel_event.is_set():
+                        logger.info("[generate] - QueryID: %s", query_id)
+                        await queue.put(f"data: {json.dumps({'type': 'generation_cancelled', 'query_id': query_id, 'message': '生成已取消'})}\n\n")
+                        break
+
+                    # ✅ 转换为 SSE 格式（队列满时等待消费者，保持背压）
+                    await queue.put(f"data: {json.dumps(event)}\n\n")
+            except Exception as e:
+                logger.error("❌ SSE查询V2失败: %s", e, exc_info=True)
+                error_event = {
+                    "type": "error",
+                    "content": f"查询处理失败: {str(e)}",
+                    "query_id": query_id,
+                    "session_id": query_request.session_id,
+                    "timestamp": time.time(),
+                }
+                await queue.put(f"data: {json.dumps(error_event)}\n\n")
+
+            # ✅ 结束标记（被取消时不写入：消费者已经退出）
+            await queue.put(None)
+
+        # ✅ 有界队列连接生产者与响应流
+        # - yield 不能放在 TaskGroup 内：生成器在 yield 处被 aclose() 时，
+        #   GeneratorExit 会被 TaskGroup 包装成 BaseExceptionGroup，无法正常关闭
+        # - 因此直接创建两个后台任务，在 finally 中统一取消并等待，GeneratorExit 原样向上传播
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=_SSE_QUEUE_MAXSIZE)
+        producer_task = asyncio.create_task(produce())
         watch_task = asyncio.create_task(watch_disconnect())
 
         try:
-            # ✅ 调用 agent_provider.query() 处理查询
-            agent_provider = get_agent_provider()
-            async for event in agent_provider.query(
-                query_id=query_id,
-                query=query_request.query,
-                user_id=user_id,
-                org_id=org_id,
-                role=role,
-                username=username,
-                account_ids=account_ids_list,
-                gcp_account_ids=gcp_account_ids_list,
-                session_id=query_request.session_id,
-                model_id=query_request.model_id,
-                cancel_event=cancel_event,
-                images=query_request.images,
-                files=query_request.files,
-            ):
-                # ✅ 在每次 yield 前检查取消标志
-                if cancel_event.is_set():
-                    logger.info("[generate] - QueryID: %s", query_id)
-                    yield f"data: {json.dumps({'type': 'generation_cancelled', 'query_id': query_id, 'message': '生成已取消'})}\n\n"
-                    break
-
-                # ✅ 转换为 SSE 格式
-                yield f"data: {json.dumps(event)}\n\n"
+            while (frame := await queue.get()) is not None:
+                yield frame
         except asyncio.CancelledError:
             logger.info("[generate] - QueryID: %s", query_id)
-            cancel_event.set()  # ✅ 确保设置取消标志
-        except Exception as e:
-            logger.error("❌ SSE查询V2失败: %s", e, exc_info=True)
-            error_event = {
-                "type": "error",
-                "content": f"查询处理失败: {str(e)}",
-                "query_id": query_id,
-                "session_id": query_request.session_id,
-                "timestamp": time.time(),
-            }
-            yield f"data: {json.dumps(error_event)}\n\n"
+            raise
         finally:
-            # ✅ 取消后台监控任务
+            if not producer_task.done():
+                cancel_event.set()  # ✅ 提前结束（断开/取消），通知业务层停止查询
+            producer_task.cancel()
             watch_task.cancel()
-            try:
-                await watch_task
-            except asyncio.CancelledError:
-                pass
+            await asyncio.gather(producer_task, watch_task, return_exceptions=True)
 
     return StreamingResponse(
         generate(),
@@ -1,14 +1,17 @@
 """用户管理 API - 仅管理员可访问"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field, field_validator
+import asyncio
+import re
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from backend.services.audit_logger import get_audit_logger
 from backend.services.user_storage import get_user_storage
-from backend.utils.auth import get_current_admin_user, hash_password
-from backend.database import get_db
+from backend.utils.auth import get_current_admin_user, hash_password_async
+from backend.database import get_db, get_session_local
 from backend.models.chat import ChatSession
 from backend.models.permission import AWSAccountPermission, GCPAccountPermission
 from backend.models.monitoring import MonitoringConfig
@@ -19,6 +22,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/users", tags=["用户管理"])
 
+# 用户名校验：邮箱格式，或字母/数字/下划线/连字符（至少包含一个字母或数字）
+# 邮箱沿用原有的宽松规则：恰好一个 @，且 @ 之后包含 .
+_EMAIL_RE = re.compile(r"[^@]*@[^@]*\.[^@]*")
+_USERNAME_RE = re.compile(r"(?=[\w-]*[^\W_])[\w-]+")
+
+# 不能返回给前端的敏感字段
+_SENSITIVE_FIELDS = frozenset({"password_hash"})
+
+
+def _sanitize(user: dict) -> dict:
+    """移除用户字典中的敏感信息"""
+    return {k: v for k, v in user.items() if k not in _SENSITIVE_FIELDS}
+
 
 # ===== Pydantic 模型 =====
 
@@ -26,6 +42,9 @@ router = APIRouter(prefix="/api/users", tags=["用户管理"])
 class UserCreateRequest(BaseModel):
     """创建用户请求（管理员添加用户，无需密码，发送激活邮件）"""
 
+    # 前端新建表单会一并提交 is_active 等字段，因此忽略（而非拒绝）额外字段
+    model_config = ConfigDict(frozen=True)
+
     username: str = Field(..., min_length=3, max_length=255, description="用户名（邮箱地址）")
     email: str | None = Field(None, max_length=255, description="邮箱地址")
     full_name: str | None = Field(None, max_length=100, description="真实姓名")
@@ -36,19 +55,14 @@ class UserCreateRequest(BaseModel):
     def username_alphanumeric(cls, v):
         # 允许邮箱格式作为用户名
         if "@" in v:
-            # 简单的邮箱格式验证
-            if not v.count("@") == 1 or "." not in v.split("@")[1]:
+            if not _EMAIL_RE.fullmatch(v):
                 raise ValueError("邮箱格式不正确")
             return v
         # 普通用户名只允许字母、数字、下划线和连字符
-        if not v.replace("_", "").replace("-", "").isalnum():
+        if not _USERNAME_RE.fullmatch(v):
             raise ValueError("用户名只能包含字母、数字、下划线、连字符，或使用邮箱格式")
         return v
 
-        if not any(c.isdigit() for c in v):
-            raise ValueError("密码必须包含至少一个数字")
-        return v
-
     @field_validator("role")
     @classmethod
     def validate_role(cls, v):
@@ -60,6 +74,8 @@ class UserCreateRequest(BaseModel):
 class UserUpdateRequest(BaseModel):
     """更新用户请求"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     full_name: str | None = Field(None, max_length=100)
     role: str | None = None
     is_active: bool | None = None
@@ -75,6 +91,8 @@ class UserUpdateRequest(BaseModel):
 class PasswordChangeRequest(BaseModel):
     """修改密码请求"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     new_password: str = Field(..., min_length=8)
 
     @field_validator("new_password")
@@ -82,19 +100,58 @@ class PasswordChangeRequest(BaseModel):
     def password_strength(cls, v):
         if len(v) < 8:
             raise ValueError("密码长度至少为8位")
-        if not any(c.isupper() for c in v):
+
+        # 单次遍历同时检查三类字符，全部满足即提前结束
+        has_upper = has_lower = has_digit = False
+        for c in v:
+            has_upper = has_upper or c.isupper()
+            has_lower = has_lower or c.islower()
+            has_digit = has_digit or c.isdigit()
+            if has_upper and has_lower and has_digit:
+                return v
+
+        if not has_upper:
             raise ValueError("密码必须包含至少一个大写字母")
-        if not any(c.islower() for c in v):
+        if not has_lower:
             raise ValueError("密码必须包含至少一个小写字母")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("密码必须包含至少一个数字")
-        return v
+        raise ValueError("密码必须包含至少一个数字")
 
 
 class UserAccountPermissionRequest(BaseModel):
     """账号授权请求"""
 
-    account_ids: list[str] = Field(..., description="账号ID列表")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    account_ids: list[str] = Field(..., max_length=1000, description="账号ID列表（单次最多1000个）")
+
+
+# ===== 后台任务 =====
+
+
+async def _send_activation_email_task(user_id: str, email: str, full_name: str | None):
+    """
+    后台发送激活邮件
+
+    在响应返回后执行，使用独立的数据库会话（请求级会话此时已关闭）。
+    发送失败只记录日志，用户保持未激活状态，可通过 /api/auth/resend-activation 重新发送。
+    """
+    from backend.services.email_verification_service import get_email_verification_service
+
+    db = get_session_local()()
+    try:
+        verification_service = get_email_verification_service(db)
+        result = await verification_service.send_activation_email(
+            user_id=user_id, email=email, full_name=full_name
+        )
+        if not result["success"]:
+            logger.error(
+                "❌ 激活邮件发送失败 - user_id: %s, email: %s, 原因: %s",
+                user_id, email, result["message"],
+            )
+    except Exception as e:
+        logger.error("❌ 激活邮件发送异常 - user_id: %s, email: %s: %s", user_id, email, e)
+    finally:
+        db.close()
 
 
 # ===== API 端点 =====
@@ -108,15 +165,17 @@ async def get_users(current_user: dict = Depends(get_current_admin_user)):
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    users = user_storage.get_users_by_org(current_user["org_id"])
+    users = user_storage.get_users_by_org_cached(current_user["org_id"])
 
-    # 移除敏感信息
-    return [{k: v for k, v in user.items() if k != "password_hash"} for user in users]
+    # SQL 未查询 password_hash，无需再逐个过滤
+    return users
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_user(
-    request: UserCreateRequest, current_user: dict = Depends(get_current_admin_user)
+    request: UserCreateRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_admin_user),
 ):
     """
     创建新用户（发送激活邮件）
@@ -126,14 +185,12 @@ async def create_user(
     - 新用户将属于当前管理员所在的组织
     - 不需要提供密码，系统将发送激活邮件
     - 用户通过激活链接自行设置密码
+    - 激活邮件在响应返回后后台发送，失败时可通过重新发送激活邮件接口补发
     """
-
-    from backend.database import get_db
-    from backend.services.email_verification_service import get_email_verification_service
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
 
     user_storage = get_user_storage()
-    db = next(get_db())
-    verification_service = get_email_verification_service(db)
 
     try:
         # 使用username作为email（username已经验证为邮箱格式）
@@ -143,47 +200,40 @@ async def create_user(
             email = request.email
 
         # 1. 创建用户（临时密码，is_active=False）
-        new_user = user_storage.create_user(
-            org_id=current_user["org_id"],
+        new_user = await asyncio.to_thread(
+            user_storage.create_user,
+            org_id=org_id,
             username=email,
             email=email,
-            password_hash=hash_password("temporary_placeholder_password"),  # 临时占位密码
+            password_hash=await hash_password_async("temporary_placeholder_password"),  # 临时占位密码
             full_name=request.full_name,
             role=request.role,
         )
 
         # 2. 立即将用户设置为未激活状态
-        user_storage.update_user(new_user["id"], is_active=False)
+        await asyncio.to_thread(user_storage.update_user, new_user["id"], is_active=False)
 
-        # 3. 发送激活邮件
-        activation_result = await verification_service.send_activation_email(
-            user_id=new_user["id"], email=email, full_name=request.full_name
+        # 3. 后台发送激活邮件（不阻塞响应）
+        background_tasks.add_task(
+            _send_activation_email_task, new_user["id"], email, request.full_name
         )
 
-        if not activation_result["success"]:
-            # 如果发送失败，删除创建的用户
-            user_storage.delete_user(new_user["id"])
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"发送激活邮件失败: {activation_result['message']}",
-            )
-
         logger.info("- user_id: %s, email: %s", new_user['id'], email)
 
         # 记录审计日志
         audit_logger = get_audit_logger()
         audit_logger.log_user_create(
-            creator_id=current_user["id"],
-            org_id=current_user["org_id"],
+            creator_id=admin_id,
+            org_id=org_id,
             new_user_id=new_user["id"],
             username=email,
         )
 
         # 移除敏感信息并返回
         return {
-            **{k: v for k, v in new_user.items() if k != "password_hash"},
-            "activation_email_sent": True,
-            "message": "用户创建成功，激活邮件已发送",
+            **_sanitize(new_user),
+            "activation_email_queued": True,
+            "message": "用户创建成功，激活邮件正在发送",
         }
 
     except ValueError as e:
@@ -193,8 +243,6 @@ async def create_user(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"创建用户失败: {str(e)}"
         )
-    finally:
-        db.close()
 
 
 @router.get("/{user_id}", response_model=dict)
@@ -205,17 +253,13 @@ async def get_user(user_id: str, current_user: dict = Depends(get_current_admin_
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 确保用户属于同一组织
-    if user["org_id"] != current_user["org_id"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问其他组织的用户")
-
     # 移除敏感信息
-    return {k: v for k, v in user.items() if k != "password_hash"}
+    return _sanitize(user)
 
 
 @router.put("/{user_id}", response_model=dict)
@@ -228,21 +272,17 @@ async def update_user(
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 确保用户属于同一组织
-    if user["org_id"] != current_user["org_id"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权修改其他组织的用户")
-
     # 更新用户
     updates = request.model_dump(exclude_unset=True)
-    updated_user = user_storage.update_user(user_id, **updates)
+    updated_user = await asyncio.to_thread(user_storage.update_user, user_id, **updates)
 
     # 移除敏感信息
-    return {k: v for k, v in updated_user.items() if k != "password_hash"}
+    return _sanitize(updated_user)
 
 
 @router.put("/{user_id}/password")
@@ -257,19 +297,14 @@ async def change_user_password(
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 确保用户属于同一组织
-    if user["org_id"] != current_user["org_id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="无权修改其他组织的用户密码"
-        )
-
     # 更新密码
-    user_storage.update_password(user_id, hash_password(request.new_password))
+    password_hash = await hash_password_async(request.new_password)
+    await asyncio.to_thread(user_storage.update_password, user_id, password_hash)
 
     return {"message": "密码修改成功"}
 
@@ -287,14 +322,11 @@ async def get_user_delete_impact(
     **说明：** 返回删除该用户时会级联删除的数据统计
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    if user["org_id"] != current_user["org_id"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权查看其他组织的用户")
-
     chat_session_count = (
         db.query(func.count(ChatSession.id))
         .filter(ChatSession.user_id == user_id)
@@ -334,28 +366,26 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_adm
     **权限：** 仅管理员
     **说明：** 级联删除用户的所有云账号授权
     """
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, org_id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 确保用户属于同一组织
-    if user["org_id"] != current_user["org_id"]:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权删除其他组织的用户")
-
     # 不允许删除自己
-    if user_id == current_user["id"]:
+    if user_id == admin_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不能删除自己")
 
     # 删除用户
-    user_storage.delete_user(user_id)
+    await asyncio.to_thread(user_storage.delete_user, user_id)
 
     # 记录审计日志
     audit_logger = get_audit_logger()
     audit_logger.log_user_delete(
-        deleter_id=current_user["id"],
-        org_id=current_user["org_id"],
+        deleter_id=admin_id,
+        org_id=org_id,
         deleted_user_id=user_id,
         username=user["username"],
     )
@@ -374,12 +404,12 @@ async def get_user_aws_accounts(user_id: str, current_user: dict = Depends(get_c
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    return user_storage.get_user_aws_accounts(user_id)
+    return await asyncio.to_thread(user_storage.get_user_aws_accounts, user_id)
 
 
 @router.post("/{user_id}/aws-accounts")
@@ -393,25 +423,28 @@ async def grant_aws_accounts(
 
     **权限：** 仅管理员
     """
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, org_id)
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 批量授权
-    audit_logger = get_audit_logger()
-    for account_id in request.account_ids:
-        user_storage.grant_aws_account(user_id, account_id, current_user["id"])
+    # 批量授权（单条 INSERT，已存在的授权跳过），在线程池中执行避免阻塞事件循环
+    await asyncio.to_thread(
+        user_storage.grant_aws_accounts_bulk, user_id, request.account_ids, admin_id
+    )
 
-        # 记录审计日志
-        audit_logger.log_permission_grant(
-            user_id=current_user["id"],
-            org_id=current_user["org_id"],
-            target_user_id=user_id,
-            account_id=account_id,
-            account_type="aws",
-        )
+    # 记录审计日志
+    audit_logger = get_audit_logger()
+    audit_logger.log_permission_grant_bulk(
+        user_id=admin_id,
+        org_id=org_id,
+        target_user_id=user_id,
+        account_ids=request.account_ids,
+        account_type="aws",
+    )
 
     return {
         "message": f"成功授权 {len(request.account_ids)} 个AWS账号",
@@ -428,19 +461,21 @@ async def revoke_aws_account(
 
     **权限：** 仅管理员
     """
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, org_id)
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    user_storage.revoke_aws_account(user_id, account_id)
+    await asyncio.to_thread(user_storage.revoke_aws_account, user_id, account_id)
 
     # 记录审计日志
     audit_logger = get_audit_logger()
     audit_logger.log_permission_revoke(
-        user_id=current_user["id"],
-        org_id=current_user["org_id"],
+        user_id=admin_id,
+        org_id=org_id,
         target_user_id=user_id,
         account_id=account_id,
         account_type="aws",
@@ -457,12 +492,12 @@ async def get_user_gcp_accounts(user_id: str, current_user: dict = Depends(get_c
     **权限：** 仅管理员
     """
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, current_user["org_id"])
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    return user_storage.get_user_gcp_accounts(user_id)
+    return await asyncio.to_thread(user_storage.get_user_gcp_accounts, user_id)
 
 
 @router.post("/{user_id}/gcp-accounts")
@@ -476,25 +511,28 @@ async def grant_gcp_accounts(
 
     **权限：** 仅管理员
     """
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, org_id)
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    # 批量授权
-    audit_logger = get_audit_logger()
-    for account_id in request.account_ids:
-        user_storage.grant_gcp_account(user_id, account_id, current_user["id"])
+    # 批量授权（单条 INSERT，已存在的授权跳过），在线程池中执行避免阻塞事件循环
+    await asyncio.to_thread(
+        user_storage.grant_gcp_accounts_bulk, user_id, request.account_ids, admin_id
+    )
 
-        # 记录审计日志
-        audit_logger.log_permission_grant(
-            user_id=current_user["id"],
-            org_id=current_user["org_id"],
-            target_user_id=user_id,
-            account_id=account_id,
-            account_type="gcp",
-        )
+    # 记录审计日志
+    audit_logger = get_audit_logger()
+    audit_logger.log_permission_grant_bulk(
+        user_id=admin_id,
+        org_id=org_id,
+        target_user_id=user_id,
+        account_ids=request.account_ids,
+        account_type="gcp",
+    )
 
     return {
         "message": f"成功授权 {len(request.account_ids)} 个GCP账号",
@@ -511,19 +549,21 @@ async def revoke_gcp_account(
 
     **权限：** 仅管理员
     """
+    org_id = current_user["org_id"]
+    admin_id = current_user["id"]
     user_storage = get_user_storage()
-    user = user_storage.get_user_by_id(user_id)
+    user = user_storage.get_user_in_org(user_id, org_id)
 
-    if not user or user["org_id"] != current_user["org_id"]:
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在")
 
-    user_storage.revoke_gcp_account(user_id, account_id)
+    await asyncio.to_thread(user_storage.revoke_gcp_account, user_id, account_id)
 
     # 记录审计日志
     audit_logger = get_audit_logger()
     audit_logger.log_permission_revoke(
-        user_id=current_user["id"],
-        org_id=current_user["org_id"],
+        user_id=admin_id,
+        org_id=org_id,
         target_user_id=user_id,
         account_id=account_id,
         account_type="gcp",
@@ -3,15 +3,105 @@ AWS Secrets Manager 集成模块
 用于从 AWS Secrets Manager 获取生产环境的敏感配置信息
 """
 
-import json
+import asyncio
+import atexit
+import contextlib
 import logging
+import threading
+from functools import lru_cache
 from typing import Any
 
 import boto3
+import orjson
+from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Secrets Manager 客户端配置（超时、自适应重试、连接池、TCP keepalive）
+_CLIENT_CONFIG = Config(
+    connect_timeout=2,
+    read_timeout=5,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    max_pool_connections=50,
+    tcp_keepalive=True,
+)
+
+# 进程内共享的客户端：(region_name, profile_name) -> client
+# boto3 客户端线程安全，复用可避免重复的端点解析和 TLS 握手
+_clients: dict[tuple[str, str | None], Any] = {}
+_clients_lock = threading.Lock()
+
+# 客户端侧密钥缓存配置：每小时后台刷新；刷新失败时继续返回旧值（stale-while-revalidate）
+# 注意：SecretCache 刷新时先调用 DescribeSecret 再调用 GetSecretValue，
+# 运行角色需同时具备 secretsmanager:DescribeSecret 与 secretsmanager:GetSecretValue 权限
+_SECRET_CACHE_CONFIG = SecretCacheConfig(max_cache_size=16, secret_refresh_interval=3600)
+
+# (region_name, profile_name) -> SecretCache
+_secret_caches: dict[tuple[str, str | None], SecretCache] = {}
+
+
+def _get_client(region_name: str, profile_name: str | None):
+    """获取（或创建）指定区域 / profile 的 Secrets Manager 客户端"""
+    key = (region_name, profile_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # 如果指定了 profile，使用 Session；否则使用默认凭证链（EC2 上自动使用 IAM Role）
+            session = boto3.Session(profile_name=profile_name) if profile_name else boto3.Session()
+            client = session.client(
+                "secretsmanager", region_name=region_name, config=_CLIENT_CONFIG
+            )
+            if not _clients:
+                atexit.register(_close_clients)
+            _clients[key] = client
+            logger.info(
+                "✅ Secrets Manager 客户端初始化成功 - Region: %s, Profile: %s",
+                region_name, profile_name or "默认凭证/IAM Role",
+            )
+    return client
+
+
+def _get_secret_cache(region_name: str, profile_name: str | None) -> SecretCache:
+    """获取（或创建）指定区域 / profile 的密钥缓存"""
+    key = (region_name, profile_name)
+    cache = _secret_caches.get(key)
+    if cache is not None:
+        return cache
+
+    client = _get_client(region_name, profile_name)
+    with _clients_lock:
+        cache = _secret_caches.get(key)
+        if cache is None:
+            cache = SecretCache(config=_SECRET_CACHE_CONFIG, client=client)
+            _secret_caches[key] = cache
+    return cache
+
+
+def refresh_secret_caches() -> None:
+    """
+    丢弃所有已缓存的密钥，下次访问时重新从 Secrets Manager 获取
+
+    用于密钥轮换后的运维刷新（应用收到 SIGHUP 时调用）
+    """
+    with _clients_lock:
+        _secret_caches.clear()
+    logger.info("🔄 Secrets Manager 密钥缓存已清空")
+
+
+def _close_clients():
+    """进程退出时关闭共享客户端，释放连接池"""
+    with _clients_lock:
+        for client in _clients.values():
+            with contextlib.suppress(Exception):
+                client.close()
+        _clients.clear()
+
 
 class AWSSecretsManager:
     """AWS Secrets Manager 客户端封装"""
@@ -36,22 +126,10 @@ class AWSSecretsManager:
 
     @property
     def client(self):
-        """延迟初始化客户端（支持 IAM Role 和 Profile）"""
+        """延迟获取客户端（支持 IAM Role 和 Profile，同一区域 / profile 进程内共享）"""
         if self._client is None:
             try:
-                # 如果指定了 profile，使用 Session
-                if self.profile_name:
-                    session = boto3.Session(profile_name=self.profile_name)
-                    self._client = session.client("secretsmanager", region_name=self.region_name)
-                    logger.info(
-                        f"✅ Secrets Manager 客户端初始化成功 - Region: {self.region_name}, Profile: {self.profile_name}"
-                    )
-                else:
-                    # EC2 上会自动使用 IAM Role
-                    self._client = boto3.client("secretsmanager", region_name=self.region_name)
-                    logger.info(
-                        f"✅ Secrets Manager 客户端初始化成功 - Region: {self.region_name} (使用默认凭证/IAM Role)"
-                    )
+                self._client = _get_client(self.region_name, self.profile_name)
             except Exception as e:
                 logger.error("Secrets Manager : %s", e)
                 raise
@@ -59,7 +137,7 @@ class AWSSecretsManager:
 
     def get_secret(self, secret_name: str) -> dict[str, Any]:
         """
-        从 Secrets Manager 获取密钥
+        从 Secrets Manager 获取密钥（经 aws-secretsmanager-caching 客户端缓存）
 
         Args:
             secret_name: 密钥名称
@@ -71,14 +149,16 @@ class AWSSecretsManager:
             ClientError: 获取密钥失败
         """
         try:
-            logger.info(": %s", secret_name)
-            response = self.client.get_secret_value(SecretId=secret_name)
+            logger.debug(": %s", secret_name)
+            # 命中客户端缓存时不发起 API 调用
+            secret_string = _get_secret_cache(self.region_name, self.profile_name).get_secret_string(
+                secret_name
+            )
 
             # 解析 JSON 字符串
-            secret_string = response["SecretString"]
-            secret_data = json.loads(secret_string)
+            secret_data = orjson.loads(secret_string)
 
-            logger.info(": %s", secret_name)
+            logger.debug(": %s", secret_name)
             return secret_data
 
         except ClientError as e:
@@ -97,6 +177,26 @@ class AWSSecretsManager:
                 logger.error(": %s", error_code)
             raise
 
+    def refresh(self) -> None:
+        """丢弃该区域 / profile 的密钥缓存，下次访问时重新获取"""
+        with _clients_lock:
+            _secret_caches.pop((self.region_name, self.profile_name), None)
+
+    async def aget_secret(self, secret_name: str) -> dict[str, Any]:
+        """
+        异步获取密钥（供 FastAPI 运行期调用）
+
+        boto3 为同步 I/O，在线程池中执行，避免 HTTPS 往返阻塞事件循环；
+        客户端在实例上复用，不重复建立 TLS 连接。
+
+        Args:
+            secret_name: 密钥名称
+
+        Returns:
+            解析后的密钥字典
+        """
+        return await asyncio.to_thread(self.get_secret, secret_name)
+
     def get_rds_config(self, secret_name: str = "costq/rds/postgresql") -> dict[str, Any]:
         """
         获取 RDS PostgreSQL 连接配置
@@ -141,11 +241,12 @@ class AWSSecretsManager:
             logger.error(": %s", e)
             raise
 
-
-# 全局单例（注意：不再使用全局单例，因为 profile 可能不同）
-_secrets_manager: AWSSecretsManager | None = None
+    async def abuild_database_url(self, secret_name: str = "costq/rds/postgresql") -> str:
+        """异步构建 PostgreSQL 数据库连接字符串（在线程池中执行，见 build_database_url）"""
+        return await asyncio.to_thread(self.build_database_url, secret_name)
 
 
+@lru_cache(maxsize=8)
 def get_secrets_manager(
     region_name: str = "ap-northeast-1", profile_name: str | None = None
 ) -> AWSSecretsManager:
@@ -160,7 +261,7 @@ def get_secrets_manager(
         AWSSecretsManager 实例
 
     Note:
-        由于不同环境可能使用不同的 profile，这里不再使用全局单例
+        按 (region_name, profile_name) 缓存实例，不同 profile 互不影响；
+        底层 boto3 客户端同样按该组合在进程内共享
     """
-    # 每次都创建新实例，以支持不同的 profile
     return AWSSecretsManager(region_name, profile_name)
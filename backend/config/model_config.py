@@ -6,6 +6,11 @@
 
 from pydantic import BaseModel
 
+__all__ = [
+    "ModelConfig",
+    "AVAILABLE_MODELS",
+]
+
 
 class ModelConfig(BaseModel):
     """AI 模型配置"""
@@ -17,7 +22,7 @@ class ModelConfig(BaseModel):
 
 
 # 可用模型列表（集中配置）
-AVAILABLE_MODELS: list[ModelConfig] = [
+AVAILABLE_MODELS: tuple[ModelConfig, ...] = (
     ModelConfig(
         model_id="jp.anthropic.claude-sonnet-4-6",
         name="sonnet46",
@@ -34,5 +39,4 @@ AVAILABLE_MODELS: list[ModelConfig] = [
         description="haiku45",
         is_default=True,
     ),
-]
-
+)
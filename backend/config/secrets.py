@@ -4,15 +4,20 @@ AWS Secrets Manager 集成
 生产环境数据库密码管理的最佳实践实现
 """
 
-import json
+import asyncio
 import logging
-from functools import lru_cache
+import threading
+import time
 
 import boto3
+import orjson
 
 # 初始化标准 logger
 logger = logging.getLogger(__name__)
 
+# 密钥缓存 TTL（秒）
+SECRET_CACHE_TTL_SECONDS = 3600
+
 
 class SecretsManager:
     """
@@ -32,25 +37,36 @@ class SecretsManager:
         >>> print(db_creds['host'])
     """
 
-    def __init__(self, region_name: str = "us-east-1"):
+    def __init__(self, region_name: str = "us-east-1", cache_ttl: float = SECRET_CACHE_TTL_SECONDS):
         """
         初始化 Secrets Manager 客户端
 
         Args:
             region_name: AWS 区域名称
+            cache_ttl: 密钥缓存有效期（秒）
         """
+        # (secret_name, version_stage) -> (写入时间, 密钥内容)
+        self._cache: dict[tuple[str, str], tuple[float, dict]] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_ttl = cache_ttl
+
         try:
             self.client = boto3.client("secretsmanager", region_name=region_name)
             self.region = region_name
+
+            # 预先取出异常类型，避免每次调用时经由 client.exceptions 动态查找
+            exceptions = self.client.exceptions
+            self._resource_not_found_exc = exceptions.ResourceNotFoundException
+            self._invalid_request_exc = exceptions.InvalidRequestException
+            self._invalid_parameter_exc = exceptions.InvalidParameterException
             logger.info("Secrets Manager - Region: %s", region_name)
         except Exception as e:
             logger.error("Secrets Manager : %s", e)
             raise
 
-    @lru_cache(maxsize=10)
     def get_secret(self, secret_name: str, version_stage: str = "AWSCURRENT") -> dict:
         """
-        获取密钥（带缓存）
+        获取密钥（带 TTL 缓存，按密钥单独过期）
 
         Args:
             secret_name: Secret 名称（如 "prod/strands-agent/db"）
@@ -66,6 +82,31 @@ class SecretsManager:
             >>> secret = secrets.get_secret("prod/myapp/db")
             >>> print(secret['password'])
         """
+        key = (secret_name, version_stage)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._cache_ttl:
+            return cached[1]
+
+        secret = self._fetch_secret(secret_name, version_stage)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), secret)
+        return secret
+
+    async def aget_secret(self, secret_name: str, version_stage: str = "AWSCURRENT") -> dict:
+        """
+        异步获取密钥（带 TTL 缓存）
+
+        命中缓存时直接返回；未命中时在线程池中执行 boto3 调用，避免阻塞事件循环
+        """
+        with self._cache_lock:
+            cached = self._cache.get((secret_name, version_stage))
+        if cached is not None and time.monotonic() - cached[0] < self._cache_ttl:
+            return cached[1]
+        return await asyncio.to_thread(self.get_secret, secret_name, version_stage)
+
+    def _fetch_secret(self, secret_name: str, version_stage: str) -> dict:
+        """从 Secrets Manager 拉取密钥（不走缓存）"""
         try:
             logger.debug(": %s (Stage: %s)", secret_name, version_stage)
 
@@ -75,23 +116,23 @@ class SecretsManager:
 
             # 解析密钥值
             if "SecretString" in response:
-                secret = json.loads(response["SecretString"])
+                secret = orjson.loads(response["SecretString"])
             else:
                 # Binary secret (base64 encoded)
                 import base64
 
-                secret = json.loads(base64.b64decode(response["SecretBinary"]))
+                secret = orjson.loads(base64.b64decode(response["SecretBinary"]))
 
             logger.info(": %s", secret_name)
             return secret
 
-        except self.client.exceptions.ResourceNotFoundException:
+        except self._resource_not_found_exc:
             logger.error(": %s", secret_name)
             raise ValueError(f"Secret '{secret_name}' not found in region '{self.region}'")
-        except self.client.exceptions.InvalidRequestException as e:
+        except self._invalid_request_exc as e:
             logger.error(": %s", e)
             raise
-        except self.client.exceptions.InvalidParameterException as e:
+        except self._invalid_parameter_exc as e:
             logger.error(": %s", e)
             raise
         except Exception as e:
@@ -141,13 +182,15 @@ class SecretsManager:
         """
         刷新缓存的密钥
 
-        在密钥轮换后调用，确保获取最新版本
+        在密钥轮换后调用，确保获取最新版本（仅失效该密钥的缓存，其他密钥不受影响）
 
         Args:
             secret_name: Secret 名称
         """
         logger.info(": %s", secret_name)
-        self.get_secret.cache_clear()
+        with self._cache_lock:
+            for key in [k for k in self._cache if k[0] == secret_name]:
+                del self._cache[key]
 
     def list_secrets(self, filters: dict | None = None) -> list:
         """
@@ -175,8 +218,9 @@ class SecretsManager:
             raise
 
 
-# 单例实例（仅在需要时创建）
+# 单例实例（仅在需要时创建，进程内共享，缓存跨请求复用）
 _secrets_manager_instance: SecretsManager | None = None
+_secrets_manager_lock = threading.Lock()
 
 
 def get_secrets_manager(region_name: str = "us-east-1") -> SecretsManager:
@@ -192,7 +236,9 @@ def get_secrets_manager(region_name: str = "us-east-1") -> SecretsManager:
     global _secrets_manager_instance
 
     if _secrets_manager_instance is None:
-        _secrets_manager_instance = SecretsManager(region_name=region_name)
+        with _secrets_manager_lock:
+            if _secrets_manager_instance is None:
+                _secrets_manager_instance = SecretsManager(region_name=region_name)
 
     return _secrets_manager_instance
 
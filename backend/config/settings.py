@@ -4,15 +4,93 @@
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import Field, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic.fields import FieldInfo
+from pydantic_settings import (
+    BaseSettings,
+    PydanticBaseSettingsSource,
+    SettingsConfigDict,
+)
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
+# 进程启动时的运行环境（before 模式校验器无法读取其他字段，直接取环境变量，进程内不变）
+_ENV = os.getenv("ENVIRONMENT", "local")
+
+# 禁止使用的弱 JWT 密钥（已统一小写，比较时对输入做 casefold）
+_FORBIDDEN_JWT_KEYS = frozenset(
+    {
+        "your-secret-key-change-in-production-2024",
+        "dev-jwt-key-change-in-production",
+        "secret",
+        "secret-key",
+        "jwt-secret",
+        "change-me",
+    }
+)
+
+
+class ConsolidatedSecretSource(PydanticBaseSettingsSource):
+    """
+    合并密钥配置源
+
+    配置 CONSOLIDATED_SECRET_NAME（环境变量或 .env）后，通过一次 GetSecretValue 读取 JSON 密钥，
+    用其中与 Settings 字段同名的键（如 JWT_SECRET_KEY、ENCRYPTION_KEY、DATABASE_URL）填充配置，
+    替代逐个密钥的多次网络往返。优先级低于环境变量和 .env。
+
+    未配置密钥名称时不导入 boto3、不发起任何网络请求；读取失败时记录错误并回退到其他配置源，
+    不让测试和工具脚本在导入配置模块时因缺少 AWS 凭证而失败。
+    """
+
+    def __init__(self, settings_cls: type[BaseSettings]):
+        super().__init__(settings_cls)
+        self._values: dict[str, Any] | None = None
+
+    def _load(self) -> dict[str, Any]:
+        if self._values is not None:
+            return self._values
+
+        self._values = {}
+        # 密钥名称及区域从前序配置源（初始化参数、环境变量、.env）的结果中解析
+        secret_name = self.current_state.get("CONSOLIDATED_SECRET_NAME")
+        if not secret_name:
+            return self._values
+
+        # 延迟导入：未配置合并密钥时不加载 boto3
+        from backend.config.aws_secrets import get_secrets_manager
+
+        try:
+            secrets_manager = get_secrets_manager(
+                region_name=self.current_state.get("AWS_REGION") or "ap-northeast-1",
+                profile_name=os.getenv("AWS_PROFILE"),
+            )
+            secret_data = secrets_manager.get_secret(secret_name)
+        except Exception as e:
+            import logging
+
+            logging.getLogger(__name__).error(
+                "读取合并密钥失败，回退到其他配置源 - %s: %s", secret_name, e
+            )
+            return self._values
+
+        self._values = {
+            key: value
+            for key, value in secret_data.items()
+            if key in self.settings_cls.model_fields
+        }
+        return self._values
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        return self._load().get(field_name), field_name, False
+
+    def __call__(self) -> dict[str, Any]:
+        return dict(self._load())
+
 
 class Settings(BaseSettings):
     """
@@ -58,6 +136,8 @@ class Settings(BaseSettings):
 
     # ==================== 数据库配置 ====================
     DATABASE_URL: str | None = Field(default=None, description="数据库连接字符串 (PostgreSQL)")
+    DB_POOL_SIZE: int = Field(default=10, description="数据库连接池大小")
+    DB_MAX_OVERFLOW: int = Field(default=20, description="数据库连接池最大溢出连接数")
 
     # ==================== AWS配置 ====================
     # 资源区域（RDS等）
@@ -105,6 +185,10 @@ class Settings(BaseSettings):
     RDS_SECRET_NAME: str = Field(
         default="costq/rds/postgresql", description="RDS PostgreSQL 密钥名称"
     )
+    CONSOLIDATED_SECRET_NAME: str = Field(
+        default="",
+        description="合并密钥名称（JSON，键与配置字段同名），启动时一次性读取",
+    )
 
     # AgentCore Runtime 配置
     AGENTCORE_RUNTIME_ARN: str = Field(
@@ -129,6 +213,12 @@ class Settings(BaseSettings):
     # ==================== 日志配置 ====================
     LOG_LEVEL: str = Field(default="INFO", description="日志级别")
 
+    # ==================== 性能分析 ====================
+    PROFILING_ENABLED: bool = Field(
+        default=False,
+        description="启用 pyinstrument 请求分析（管理员请求带 ?profile=1 时返回火焰图 HTML）",
+    )
+
     # ==================== CORS配置 ====================
     CORS_ORIGINS: str = Field(
         default="http://localhost:5173,http://127.0.0.1:5173,http://localhost:8000,http://127.0.0.1:8000",
@@ -148,23 +238,30 @@ class Settings(BaseSettings):
         extra="ignore",  # 忽略额外的环境变量
     )
 
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return (
+            init_settings,
+            env_settings,
+            dotenv_settings,
+            ConsolidatedSecretSource(settings_cls),
+            file_secret_settings,
+        )
+
     # ==================== 验证器 ====================
     @field_validator("JWT_SECRET_KEY", mode="before")
     @classmethod
     def validate_jwt_secret(cls, v: str, info) -> str:
         """验证JWT密钥在生产环境必须提供且足够长"""
-        # 获取环境信息
-        env = os.getenv("ENVIRONMENT", "local")
-
-        # 禁止的弱密钥列表
-        FORBIDDEN_KEYS = {
-            "your-secret-key-change-in-production-2024",
-            "dev-jwt-key-change-in-production",
-            "secret",
-            "secret-key",
-            "jwt-secret",
-            "change-me",
-        }
+        env = _ENV
+        is_forbidden = isinstance(v, str) and v.casefold() in _FORBIDDEN_JWT_KEYS
 
         if env == "production":
             if not v:
@@ -172,7 +269,7 @@ class Settings(BaseSettings):
                     "生产环境必须设置 JWT_SECRET_KEY！\n"
                     "生成方法: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
                 )
-            if v in FORBIDDEN_KEYS or v.lower() in FORBIDDEN_KEYS:
+            if is_forbidden:
                 raise ValueError(
                     "生产环境禁止使用默认或弱JWT密钥！\n"
                     "生成强密钥: python -c 'import secrets; print(secrets.token_urlsafe(32))'"
@@ -181,7 +278,7 @@ class Settings(BaseSettings):
                 raise ValueError("生产环境 JWT_SECRET_KEY 必须至少32个字符")
         else:
             # 非生产环境警告使用默认密钥
-            if v in FORBIDDEN_KEYS:
+            if is_forbidden:
                 import warnings
 
                 warnings.warn(f"使用默认JWT密钥（仅{env}环境）。生产环境必须更换！", UserWarning)
@@ -192,10 +289,8 @@ class Settings(BaseSettings):
     @classmethod
     def validate_encryption_key(cls, v: str | None, info) -> str | None:
         """验证加密密钥在生产环境必须配置且格式正确"""
-        # 在before模式下，需要从环境变量直接读取ENVIRONMENT
-        env = os.getenv("ENVIRONMENT", "local")
-
-        if env == "production":
+        # 在before模式下，使用进程启动时从环境变量读取的 ENVIRONMENT
+        if _ENV == "production":
             if not v:
                 raise ValueError(
                     "生产环境必须设置 ENCRYPTION_KEY！\n"
@@ -230,35 +325,45 @@ class Settings(BaseSettings):
         """是否是本地开发环境"""
         return self.ENVIRONMENT == "local"
 
-    @property
+    @cached_property
     def is_cloud_environment(self) -> bool:
         """
         是否运行在云环境（EC2/容器）
 
         检测逻辑:
-        - 检查 DOCKER_CONTAINER 环境变量（Runtime 容器）
+        - 检查 DOCKER_CONTAINER / AWS_EXECUTION_ENV / ECS_CONTAINER_METADATA_URI 环境变量
         - 检查是否存在 EC2 实例元数据服务
         - 生产环境默认认为是云环境
+
+        结果在实例上缓存，元数据服务每个进程最多探测一次
         """
         if self.is_production:
             return True
 
-        # 检查是否在 Docker 容器中（AgentCore Runtime）
-        import os
-
-        if os.getenv("DOCKER_CONTAINER") == "1":
+        # 检查是否在容器 / AWS 托管运行环境中（AgentCore Runtime、ECS、Lambda 等）
+        if (
+            os.getenv("DOCKER_CONTAINER") == "1"
+            or os.getenv("AWS_EXECUTION_ENV")
+            or os.getenv("ECS_CONTAINER_METADATA_URI")
+            or os.getenv("ECS_CONTAINER_METADATA_URI_V4")
+        ):
             return True
 
-        # 检查 EC2 元数据服务
-        try:
-            import requests
+        # 检查 EC2 元数据服务（延迟导入：urllib.request 会连带导入 http.client / email 等模块，
+        # 仅在需要探测时才加载，不计入启动时的导入开销）
+        import urllib.error
+        import urllib.request
 
-            # EC2 元数据服务地址（IMDSv2）
-            response = requests.get(
+        try:
+            # EC2 元数据服务地址
+            with urllib.request.urlopen(
                 "http://169.254.169.254/latest/meta-data/instance-id", timeout=0.1
-            )
-            return response.status_code == 200
-        except:
+            ) as response:
+                return response.status == 200
+        except urllib.error.HTTPError:
+            # 元数据服务有响应（如仅启用 IMDSv2 时未带 Token 返回 401），说明运行在 EC2 上
+            return True
+        except Exception:
             return False
 
     @property
@@ -279,9 +384,10 @@ class Settings(BaseSettings):
         """
         return self.AWS_REGION
 
-    def get_cors_origins_list(self) -> list[str]:
-        """获取CORS允许的来源列表"""
-        return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    @cached_property
+    def cors_origins_list(self) -> list[str]:
+        """CORS允许的来源列表（首次访问时解析并缓存）"""
+        return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
 
     def get_marketplace_allowed_sns_topic_arns(self) -> set[str]:
         """返回允许接收的 Marketplace SNS Topic ARN 集合"""
@@ -296,6 +402,7 @@ class Settings(BaseSettings):
         动态获取数据库连接字符串
 
         逻辑：
+        0. 已配置 DATABASE_URL（环境变量或 .env）时直接返回，不访问 Secrets Manager
         1. 确定目标区域 (AWS_REGION)
         2. 确定认证方式 (IAM Role vs Profile)
         3. 读取 Secrets Manager (RDS_SECRET_NAME)
@@ -305,8 +412,10 @@ class Settings(BaseSettings):
         - 并设置到环境变量 os.environ["RDS_SECRET_NAME"]
         - 这里优先从环境变量读取，支持动态切换 dev/prod 数据库
         """
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
+
         try:
-            import os
 
             from backend.config.aws_secrets import get_secrets_manager
 
@@ -342,17 +451,12 @@ class Settings(BaseSettings):
 
 
 # ==================== 全局配置实例 ====================
-_settings: Settings | None = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     获取配置实例（单例模式）
     """
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
 
 
 # 导出默认实例
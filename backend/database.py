@@ -2,6 +2,7 @@
 
 import logging
 import os
+import threading
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
@@ -12,13 +13,29 @@ from backend.models.base import Base
 logger = logging.getLogger(__name__)
 
 
+# 已解析的数据库连接字符串：(来源键, URL)
+# 来源键为 DATABASE_URL / RDS_SECRET_NAME 环境变量，Runtime 切换密钥名称时自动重新解析；
+# 密钥轮换（同名密钥换值）时由 reload_database_credentials 清除
+_DATABASE_URL: tuple[tuple[str | None, str | None], str] | None = None
+
+
+def _database_url_source_key() -> tuple[str | None, str | None]:
+    return os.getenv("DATABASE_URL"), os.getenv("RDS_SECRET_NAME")
+
+
 def get_database_url() -> str:
     """
     获取数据库连接字符串
 
     Returns:
-        PostgreSQL 连接字符串（从环境变量或 Secrets Manager 获取）
+        PostgreSQL 连接字符串（从环境变量或 Secrets Manager 获取，首次解析后缓存）
     """
+    global _DATABASE_URL
+
+    source_key = _database_url_source_key()
+    if _DATABASE_URL is not None and _DATABASE_URL[0] == source_key:
+        return _DATABASE_URL[1]
+
     try:
         # 1. 优先检查环境变量
         env_db_url = os.getenv("DATABASE_URL")
@@ -26,27 +43,38 @@ def get_database_url() -> str:
             # 隐藏密码部分用于日志
             safe_url = env_db_url.split("@")[-1] if "@" in env_db_url else "******"
             logger.info("使用环境变量配置的数据库: PostgreSQL, Host: %s", safe_url.split("/")[0])
+            _DATABASE_URL = (source_key, env_db_url)
             return env_db_url
 
-        # 2. 从AWS Secrets Manager获取云数据库连接
+        # 2. .env 中的 DATABASE_URL，否则按需从 AWS Secrets Manager 获取云数据库连接
         database_url = settings.get_database_url()
 
         # 隐藏密码部分用于日志
         safe_url = database_url.split("@")[-1] if "@" in database_url else "******"
         logger.info(
-            "从Secrets Manager获取数据库配置: PostgreSQL, Host: %s", safe_url.split("/")[0]
+            "从%s获取数据库配置: PostgreSQL, Host: %s",
+            ".env" if settings.DATABASE_URL else "Secrets Manager",
+            safe_url.split("/")[0],
         )
 
+        _DATABASE_URL = (source_key, database_url)
         return database_url
     except Exception as e:
         logger.error("获取数据库连接字符串失败: %s", e, exc_info=True)
         raise
 
 
+def invalidate_database_url() -> None:
+    """清除缓存的数据库连接字符串（密钥轮换后调用，下次获取时重新解析）"""
+    global _DATABASE_URL
+    _DATABASE_URL = None
+
+
 # 延迟初始化，避免导入时阻塞
 _engine = None
 _SessionLocal = None
 _ScopedSession = None
+_engine_lock = threading.Lock()
 
 
 def _init_engine():
@@ -56,36 +84,85 @@ def _init_engine():
     if _engine is not None:
         return
 
-    DATABASE_URL = get_database_url()
-
-    # 创建引擎（PostgreSQL 配置）
-    engine_kwargs = {
-        "echo": False,  # 生产环境设为 False
-        "pool_pre_ping": True,  # 连接池健康检查
-    }
-
-    # 仅当不是 SQLite 时添加连接池参数（为了兼容测试时的内存数据库）
-    if "sqlite" not in DATABASE_URL:
-        engine_kwargs.update(
-            {
-                "pool_size": 10,  # 连接池大小
-                "max_overflow": 20,  # 最大溢出连接数
-                "pool_timeout": 30,  # 连接超时（秒）
-                "pool_recycle": 3600,  # 连接回收时间（秒）
-            }
-        )
-    else:
-        # SQLite 特殊配置（仅用于测试）
-        engine_kwargs["connect_args"] = {"check_same_thread": False}
+    # 双重检查锁：并发首个请求只创建一次引擎（避免重复解析密钥、泄漏引擎）
+    with _engine_lock:
+        if _engine is not None:
+            return
+
+        DATABASE_URL = get_database_url()
+
+        # 创建引擎（PostgreSQL 配置）
+        engine_kwargs = {
+            "echo": False,  # 生产环境设为 False
+        }
+
+        # 仅当不是 SQLite 时添加连接池参数（为了兼容测试时的内存数据库）
+        if "sqlite" not in DATABASE_URL:
+            engine_kwargs.update(
+                {
+                    "pool_size": settings.DB_POOL_SIZE,  # 连接池大小
+                    "max_overflow": settings.DB_MAX_OVERFLOW,  # 最大溢出连接数
+                    "pool_timeout": 30,  # 连接超时（秒）
+                    "pool_recycle": 3600,  # 连接回收时间（秒）
+                    "pool_use_lifo": True,  # LIFO：优先复用热连接，空闲连接自然过期回收
+                    "pool_reset_on_return": "rollback",
+                    # TCP keepalive 探测死连接，替代 pool_pre_ping 每次 checkout 的 SELECT 1
+                    "connect_args": {
+                        "keepalives": 1,
+                        "keepalives_idle": 30,
+                        "keepalives_interval": 10,
+                        "keepalives_count": 5,
+                        "application_name": settings.APP_NAME,
+                    },
+                }
+            )
+        else:
+            # SQLite 特殊配置（仅用于测试）
+            engine_kwargs["connect_args"] = {"check_same_thread": False}
+
+        engine = create_engine(DATABASE_URL, **engine_kwargs)
+        logger.info("数据库引擎创建成功 - Environment: %s", settings.ENVIRONMENT)
+
+        # 创建会话工厂
+        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        # 创建线程安全的会话
+        _ScopedSession = scoped_session(_SessionLocal)
+
+        # 最后赋值 _engine，保证无锁快速路径看到的是完整初始化后的状态
+        _engine = engine
+
+
+def dispose_engine():
+    """释放数据库引擎及连接池（凭证轮换后调用，下次访问时重新初始化）"""
+    global _engine, _SessionLocal, _ScopedSession
+
+    with _engine_lock:
+        if _engine is None:
+            return
+
+        if _ScopedSession is not None:
+            _ScopedSession.remove()
+        _engine.dispose()
+        _engine = None
+        _SessionLocal = None
+        _ScopedSession = None
+        logger.info("数据库引擎已释放")
 
-    _engine = create_engine(DATABASE_URL, **engine_kwargs)
-    logger.info("数据库引擎创建成功 - Environment: %s", settings.ENVIRONMENT)
 
-    # 创建会话工厂
-    _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+def reload_database_credentials():
+    """
+    数据库凭证轮换后重新加载（SIGHUP 时调用）
+
+    清空 Secrets Manager 缓存与已解析的连接字符串，并释放当前连接池，
+    下次访问数据库时使用新凭证重新创建引擎
+    """
+    from backend.config.aws_secrets import refresh_secret_caches
 
-    # 创建线程安全的会话
-    _ScopedSession = scoped_session(_SessionLocal)
+    refresh_secret_caches()
+    invalidate_database_url()
+    dispose_engine()
+    logger.info("数据库凭证已重新加载")
 
 
 # 为了向后兼容，提供函数访问
@@ -98,6 +98,16 @@ async def lifespan(app: FastAPI):
         traceback.print_exc()
         alert_scheduler_started = False
 
+    # 密钥轮换：收到 SIGHUP 时清空密钥缓存和已解析的连接字符串并释放连接池，下次访问使用新凭证
+    try:
+        import signal
+
+        from .database import reload_database_credentials
+
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_database_credentials)
+    except (AttributeError, NotImplementedError, RuntimeError) as e:
+        logger.debug("SIGHUP 密钥刷新未注册: %s", e)
+
     # Phase 3: 健康检查（新架构简化版）
     # 注意：新架构无MCP缓存，无需健康检查
     health_check_task = None
@@ -138,7 +148,8 @@ async def lifespan(app: FastAPI):
                     from .database import get_engine
 
                     try:
-                        engine = get_engine()
+                        # 首次调用会初始化引擎（读取 Secrets Manager），放到线程池避免阻塞事件循环
+                        engine = await asyncio.to_thread(get_engine)
                         pool = engine.pool
                         pool_size = pool.size()
                         checked_out = pool.checkedout()
@@ -200,6 +211,17 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    # 等待异步审计日志写入完成
+    try:
+        from .services.audit_logger import get_audit_logger
+
+        if await asyncio.to_thread(get_audit_logger().flush, 10):
+            print("✅ 审计日志已全部写入")
+        else:
+            print("⚠️  审计日志写入超时，部分日志可能未落库")
+    except Exception as e:
+        print(f"⚠️  审计日志写入失败: {e}")
+
     # 新架构：无MCP缓存，无需清理
     # from .mcp.dynamic_clients import get_dynamic_client_manager
     # （已移除MCP清理代码）
@@ -270,10 +292,41 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# 性能分析中间件（仅 PROFILING_ENABLED=true 时注册，关闭时零开销）
+if settings.PROFILING_ENABLED:
+    from pyinstrument import Profiler
+
+    from .utils.auth import decode_access_token
+
+    def _is_admin_request(request: Request) -> bool:
+        """根据 Bearer Token 判断是否为管理员请求"""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            return decode_access_token(token).get("role") == "admin"
+        except Exception:
+            return False
+
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        """管理员请求带 ?profile=1 时，用 pyinstrument 分析该请求并返回 HTML 报告"""
+        if not request.query_params.get("profile") or not _is_admin_request(request):
+            return await call_next(request)
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        await call_next(request)
+        profiler.stop()
+        return HTMLResponse(profiler.output_html())
+
+    logger.warning("⚠️  性能分析中间件已启用（PROFILING_ENABLED=true）")
+
+
 # 配置CORS中间件
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.get_cors_origins_list(),  # 从配置读取允许的来源
+    allow_origins=settings.cors_origins_list,  # 从配置读取允许的来源
     allow_credentials=True,  # 允许携带认证信息（cookies, authorization headers）
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],  # 允许的HTTP方法
     allow_headers=["Authorization", "Content-Type", "Accept", "Origin"],  # 允许的请求头
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+数据库迁移: 为提示词模板列表接口添加复合/部分索引
+
+索引与 backend/api/prompt_templates.py 中列表查询的 WHERE / ORDER BY 对应：
+- get_system_templates: WHERE is_active [AND category] [AND (cloud_provider = :cp OR 'both' OR NULL)]
+                        ORDER BY display_order, created_at DESC
+  - 无筛选 / 仅 cloud_provider 筛选：idx_template_active_order 按顺序扫描，
+    cloud_provider 的 OR 条件作为过滤条件，无需 Sort
+  - 带 category 筛选：idx_template_active_cat_order 等值定位后按顺序读取，
+    cloud_provider 同样作为过滤条件
+- get_user_templates:   WHERE user_id [AND is_favorite] ORDER BY is_favorite DESC, updated_at DESC
+- get_slash_commands:   WHERE is_active ORDER BY command
+
+说明:
+- 使用 CREATE INDEX CONCURRENTLY，不阻塞线上写入（必须在事务外执行，因此走 AUTOCOMMIT 连接）
+- 003 中的 idx_user_template_user_favorite_updated 为 (user_id, is_favorite, updated_at DESC)，
+  与 ORDER BY is_favorite DESC, updated_at DESC 方向不一致无法直接使用，由新索引替代
+"""
+
+import logging
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+INDEXES = [
+    (
+        "idx_template_active_order",
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_template_active_order
+            ON prompt_templates (display_order, created_at DESC)
+            WHERE is_active
+        """,
+    ),
+    (
+        "idx_template_active_cat_order",
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_template_active_cat_order
+            ON prompt_templates (category, display_order, created_at DESC)
+            WHERE is_active
+        """,
+    ),
+    (
+        "idx_user_template_user_fav_updated",
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_template_user_fav_updated
+            ON user_prompt_templates (user_id, is_favorite DESC, updated_at DESC)
+        """,
+    ),
+    (
+        "idx_slash_active_command",
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_slash_active_command
+            ON slash_commands (command)
+            WHERE is_active
+        """,
+    ),
+]
+
+# 被新索引取代的旧索引
+SUPERSEDED_INDEXES = ["idx_user_template_user_favorite_updated"]
+
+
+def upgrade(db):
+    """升级数据库"""
+    logger.info("⬆️ 开始迁移: 添加提示词模板列表索引")
+
+    try:
+        # CONCURRENTLY 不能在事务块内执行，先结束 Session 事务，再使用 AUTOCOMMIT 连接
+        db.commit()
+
+        with db.get_bind().connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            for name, ddl in INDEXES:
+                conn.execute(text(ddl))
+                logger.info("✅ 索引已创建: %s", name)
+
+            for name in SUPERSEDED_INDEXES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                logger.info("🗑️ 旧索引已删除: %s", name)
+
+        logger.info("✅ 提示词模板列表索引迁移完成")
+
+    except Exception as e:
+        logger.error("❌ 迁移失败: %s", e)
+        db.rollback()
+        raise
+
+
+def downgrade(db):
+    """回滚数据库"""
+    logger.info("⬇️ 回滚: 删除提示词模板列表索引")
+    try:
+        db.commit()
+
+        with db.get_bind().connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_template_user_favorite_updated
+                    ON user_prompt_templates (user_id, is_favorite, updated_at DESC)
+            """))
+
+            for name, _ in INDEXES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+        logger.info("✅ 提示词模板列表索引回滚完成")
+    except Exception as e:
+        logger.error("❌ 回滚失败: %s", e)
+        db.rollback()
+        raise
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, project_root)
+
+    from backend.database import get_session_local
+
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+    try:
+        upgrade(db)
+    finally:
+        db.close()
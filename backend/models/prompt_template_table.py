@@ -1,6 +1,7 @@
 """Prompt Template SQLAlchemy 模型"""
 
 from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
 from backend.models.base import Base
@@ -18,12 +19,12 @@ class PromptTemplateTable(Base):
     category = Column(String(20), nullable=False, index=True)
     icon = Column(String(50))
     cloud_provider = Column(String(10), index=True)
-    variables = Column(Text)  # JSON string
+    variables = Column(JSONB)
     usage_count = Column(Integer, default=0)
     is_active = Column(Boolean, default=True, index=True)
     display_order = Column(Integer, default=0)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class UserPromptTemplateTable(Base):
@@ -39,11 +40,11 @@ class UserPromptTemplateTable(Base):
     description = Column(Text)
     prompt_text = Column(Text, nullable=False)
     category = Column(String(20), default="custom")
-    variables = Column(Text)  # JSON string
+    variables = Column(JSONB)
     is_favorite = Column(Boolean, default=False)
     usage_count = Column(Integer, default=0)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class SlashCommandTable(Base):
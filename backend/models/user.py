@@ -88,14 +88,21 @@ class User(Base):
     chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan")
     consents = relationship("UserConsent", back_populates="user", cascade="all, delete-orphan")
 
-    def to_dict(self):
-        """转换为字典"""
-        return {
+    def to_dict(self, include_password_hash: bool = True):
+        """转换为字典
+
+        Args:
+            include_password_hash: 是否包含 password_hash（查询时已 defer 该列则必须为 False）
+        """
+        data = {
             "id": str(self.id),  # UUID 转字符串
             "org_id": str(self.org_id),  # UUID 转字符串
             "username": self.username,
             "email": self.email,
-            "password_hash": self.hashed_password,  # API 兼容性：数据库字段是 hashed_password
+        }
+        if include_password_hash:
+            data["password_hash"] = self.hashed_password  # API 兼容性：数据库字段是 hashed_password
+        return data | {
             "full_name": self.full_name,
             "role": self.role,
             "is_active": self.is_active,
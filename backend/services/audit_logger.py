@@ -1,10 +1,13 @@
 """审计日志服务 (PostgreSQL)"""
 
 import json
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import text
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
 from backend.database import get_db
@@ -23,12 +26,34 @@ def _utc_now() -> datetime:
 # 系统操作使用的 UUID (Nil UUID)
 SYSTEM_UUID = "00000000-0000-0000-0000-000000000000"
 
+# 异步审计写入配置：队列容量、单批最大条数、凑批等待时间（秒）
+AUDIT_QUEUE_MAXSIZE = 10_000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 1.0
+
+
+def _make_serializable(obj: object) -> object:
+    """将 UUID 转为字符串，使 details 可写入 JSONB 列"""
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, dict):
+        return {k: _make_serializable(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_make_serializable(i) for i in obj]
+    return obj
+
 
 class AuditLogger:
     """审计日志记录器 - 记录所有用户操作"""
 
     def __init__(self):
-        pass
+        # emit() 入队的审计记录，由后台线程批量写入
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=AUDIT_QUEUE_MAXSIZE)
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        # 因队列已满或写入失败而丢弃的审计记录数
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
 
     def log(
         self,
@@ -58,15 +83,6 @@ class AuditLogger:
         log_id = str(uuid.uuid4())
         # ✅ 修复：jsonb 列直接接受 dict，不需要 json.dumps（避免存成字符串再被 psycopg2 二次序列化）
         # ✅ 同时将 details 中的 UUID 对象转为字符串，避免 JSON 序列化失败
-        def _make_serializable(obj: object) -> object:
-            if isinstance(obj, uuid.UUID):
-                return str(obj)
-            if isinstance(obj, dict):
-                return {k: _make_serializable(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [_make_serializable(i) for i in obj]
-            return obj
-
         details_value = _make_serializable(details) if details else None
 
         db: Session = next(get_db())
@@ -97,6 +113,141 @@ class AuditLogger:
         finally:
             db.close()
 
+    # ==================== 异步批量写入 ====================
+
+    def emit(
+        self,
+        user_id: str | None,
+        org_id: str,
+        action: str,
+        resource_type: str | None = None,
+        resource_id: str | None = None,
+        details: dict | None = None,
+    ) -> None:
+        """异步记录审计日志
+
+        只入队后立即返回，由后台线程按批（最多 AUDIT_BATCH_SIZE 条 / AUDIT_FLUSH_INTERVAL 秒）
+        写入数据库，不占用请求的关键路径。队列满时丢弃该记录并计入 dropped_count，
+        不在调用方（事件循环）线程上同步写库。参数含义同 log()。
+        """
+        row = {
+            "id": str(uuid.uuid4()),
+            "user_id": str(user_id) if user_id else user_id,
+            "org_id": str(org_id) if org_id else org_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": str(resource_id) if resource_id else resource_id,
+            "details": _make_serializable(details) if details else None,
+            "timestamp": _utc_now(),
+        }
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            dropped = self._record_dropped(1)
+            logger.warning(
+                "审计日志队列已满，丢弃记录 - action: %s, 累计丢弃: %d", action, dropped
+            )
+
+    @property
+    def dropped_count(self) -> int:
+        """因队列已满或写入失败而丢弃的审计记录数"""
+        return self._dropped
+
+    def _record_dropped(self, count: int) -> int:
+        with self._dropped_lock:
+            self._dropped += count
+            return self._dropped
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """等待已入队的审计日志全部写入（应用关闭时调用）
+
+        Returns:
+            是否在超时前全部写入
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: self._queue.unfinished_tasks == 0, timeout
+            )
+
+    def _ensure_writer(self) -> None:
+        """按需启动后台写入线程"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="audit-log-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """后台线程：凑批后一次 executemany 写入"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # 获取数据库会话失败等异常不能让写入线程退出，否则 flush() 会一直等待
+                dropped = self._record_dropped(len(batch))
+                logger.error("审计日志写入异常，丢弃 %d 条（累计 %d）: %s", len(batch), dropped, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, rows: list[dict]) -> None:
+        """批量写入审计日志（单次 INSERT executemany）
+
+        整批失败时逐条重试，只丢弃自身无法写入的记录，避免一条坏数据拖垮整批
+        """
+        db: Session = next(get_db())
+        try:
+            try:
+                db.execute(insert(AuditLog), rows)
+                db.commit()
+                logger.debug("📝 审计日志批量写入: %d 条", len(rows))
+                return
+            except Exception as e:
+                db.rollback()
+                if len(rows) == 1:
+                    dropped = self._record_dropped(1)
+                    logger.error(
+                        "审计日志写入失败，已丢弃 - action: %s, 累计丢弃: %d: %s",
+                        rows[0]["action"], dropped, e, exc_info=True,
+                    )
+                    return
+                logger.warning("审计日志批量写入失败（%d 条），逐条重试: %s", len(rows), e)
+
+            failed = 0
+            for row in rows:
+                try:
+                    db.execute(insert(AuditLog), [row])
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    failed += 1
+                    logger.error(
+                        "审计日志写入失败，已丢弃 - action: %s: %s", row["action"], e
+                    )
+            if failed:
+                dropped = self._record_dropped(failed)
+                logger.error(
+                    "审计日志逐条重试完成 - 失败: %d/%d, 累计丢弃: %d", failed, len(rows), dropped
+                )
+        finally:
+            db.close()
+
     # 便捷方法
 
     def log_login(self, user_id: str, org_id: str, ip_address: str | None = None):
@@ -285,7 +436,7 @@ class AuditLogger:
         account_type: str = "aws",
     ):
         """记录授予权限"""
-        self.log(
+        self.emit(
             user_id=user_id,
             org_id=org_id,
             action="permission_grant",
@@ -294,6 +445,25 @@ class AuditLogger:
             details={"target_user": target_user_id},
         )
 
+    def log_permission_grant_bulk(
+        self,
+        user_id: str,
+        org_id: str,
+        target_user_id: str,
+        account_ids: list[str],
+        account_type: str = "aws",
+    ):
+        """批量记录授予权限（逐条入队，由后台线程合并写入）"""
+        for account_id in account_ids:
+            self.emit(
+                user_id=user_id,
+                org_id=org_id,
+                action="permission_grant",
+                resource_type=f"{account_type}_account",
+                resource_id=account_id,
+                details={"target_user": target_user_id},
+            )
+
     def log_permission_revoke(
         self,
         user_id: str,
@@ -303,7 +473,7 @@ class AuditLogger:
         account_type: str = "aws",
     ):
         """记录撤销权限"""
-        self.log(
+        self.emit(
             user_id=user_id,
             org_id=org_id,
             action="permission_revoke",
@@ -314,7 +484,7 @@ class AuditLogger:
 
     def log_user_create(self, creator_id: str, org_id: str, new_user_id: str, username: str):
         """记录创建用户"""
-        self.log(
+        self.emit(
             user_id=creator_id,
             org_id=org_id,
             action="user_create",
@@ -325,7 +495,7 @@ class AuditLogger:
 
     def log_user_delete(self, deleter_id: str, org_id: str, deleted_user_id: str, username: str):
         """记录删除用户"""
-        self.log(
+        self.emit(
             user_id=deleter_id,
             org_id=org_id,
             action="user_delete",
@@ -1,10 +1,13 @@
 """用户存储服务 - PostgreSQL 实现（生产环境）"""
 
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
 from backend.database import get_db
 from backend.models.permission import AWSAccountPermission, GCPAccountPermission
@@ -14,6 +17,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 用户查询缓存 TTL（秒）
+# 进程内缓存，本进程的写操作会主动失效；多实例部署时其他实例最多在 TTL 内读到旧数据，
+# 因此只用于用户管理接口，认证路径（get_current_user）始终直接查库
+USER_CACHE_TTL_SECONDS = 60
+
+# 每个缓存的最大条目数，写满时先清理过期条目，仍满则淘汰最早写入的条目
+USER_CACHE_MAX_ENTRIES = 1024
+
 
 def _utc_now() -> datetime:
     """返回当前 UTC 时间"""
@@ -28,12 +39,90 @@ class UserStoragePostgreSQL:
 
     def __init__(self):
         """初始化存储服务"""
+        # user_id -> (写入时间, 用户字典)
+        self._user_cache: dict[str, tuple[float, dict]] = {}
+        # org_id -> (写入时间, 用户字典列表)
+        self._org_users_cache: dict[str, tuple[float, list[dict]]] = {}
+        self._cache_lock = threading.Lock()
         logger.info("✅ 用户存储初始化完成 - PostgreSQL (生产环境)")
 
     def _get_db(self):
         """获取数据库会话"""
         return next(get_db())
 
+    # ==================== 用户缓存 ====================
+
+    def _cache_get(self, cache: dict, key: str):
+        """读取未过期的缓存值，不存在或已过期返回 None"""
+        with self._cache_lock:
+            entry = cache.get(key)
+        if entry is None or time.monotonic() - entry[0] >= USER_CACHE_TTL_SECONDS:
+            return None
+        return entry[1]
+
+    def _cache_set(self, cache: dict, key: str, value):
+        now = time.monotonic()
+        with self._cache_lock:
+            if key not in cache and len(cache) >= USER_CACHE_MAX_ENTRIES:
+                expired = [k for k, (ts, _) in cache.items() if now - ts >= USER_CACHE_TTL_SECONDS]
+                for k in expired:
+                    del cache[k]
+                if len(cache) >= USER_CACHE_MAX_ENTRIES:
+                    del cache[next(iter(cache))]
+            cache[key] = (now, value)
+
+    def get_user_in_org(self, user_id: str, org_id: str) -> dict | None:
+        """
+        获取指定组织内的用户（带 TTL 缓存）
+
+        组织校验在 SQL 中完成（WHERE id AND org_id），不属于该组织时与不存在一样返回 None
+
+        Args:
+            user_id: 用户ID
+            org_id: 组织ID
+
+        Returns:
+            用户字典副本，不存在或不属于该组织时返回 None
+        """
+        user = self._cache_get(self._user_cache, user_id)
+        if user is not None:
+            return dict(user) if user["org_id"] == org_id else None
+
+        db = self._get_db()
+        try:
+            row = db.query(User).filter(User.id == user_id, User.org_id == org_id).first()
+            if not row:
+                return None
+            user = row.to_dict()
+        finally:
+            db.close()
+
+        self._cache_set(self._user_cache, user_id, user)
+        return dict(user)
+
+    def get_users_by_org_cached(self, org_id: str) -> list[dict]:
+        """获取组织下的所有用户（带 TTL 缓存，返回副本，不含 password_hash）"""
+        users = self._cache_get(self._org_users_cache, org_id)
+        if users is None:
+            users = self.get_users_by_org(org_id, include_password_hash=False)
+            self._cache_set(self._org_users_cache, org_id, users)
+        return [dict(user) for user in users]
+
+    def invalidate_user_cache(self, user_id: str, org_id: str | None = None):
+        """
+        失效用户缓存
+
+        Args:
+            user_id: 用户ID
+            org_id: 组织ID，未提供时从已缓存的用户信息中获取
+        """
+        with self._cache_lock:
+            entry = self._user_cache.pop(user_id, None)
+            if org_id is None and entry is not None:
+                org_id = entry[1].get("org_id")
+            if org_id is not None:
+                self._org_users_cache.pop(org_id, None)
+
     # ==================== 组织管理 ====================
 
     def create_organization(
@@ -172,6 +261,7 @@ class UserStoragePostgreSQL:
                 db.commit()
                 db.refresh(user)
 
+            self.invalidate_user_cache(user.id, org_id)
             return user.to_dict()
         except IntegrityError as e:
             db.rollback()
@@ -204,12 +294,21 @@ class UserStoragePostgreSQL:
         finally:
             db.close()
 
-    def get_users_by_org(self, org_id: str) -> list[dict]:
-        """获取组织下的所有用户"""
+    def get_users_by_org(self, org_id: str, include_password_hash: bool = True) -> list[dict]:
+        """
+        获取组织下的所有用户
+
+        Args:
+            org_id: 组织ID
+            include_password_hash: 为 False 时 SQL 不查询密码哈希列，结果中不含 password_hash
+        """
         db = self._get_db()
         try:
-            users = db.query(User).filter(User.org_id == org_id).all()
-            return [user.to_dict() for user in users]
+            query = db.query(User).filter(User.org_id == org_id)
+            if not include_password_hash:
+                query = query.options(defer(User.hashed_password, raiseload=True))
+            users = query.all()
+            return [user.to_dict(include_password_hash) for user in users]
         finally:
             db.close()
 
@@ -249,6 +348,7 @@ class UserStoragePostgreSQL:
             db.commit()
             db.refresh(user)
 
+            self.invalidate_user_cache(user_id, str(user.org_id))
             return user.to_dict()
         except Exception:
             db.rollback()
@@ -269,6 +369,7 @@ class UserStoragePostgreSQL:
             if user:
                 user.last_login_at = _utc_now()
                 db.commit()
+                self.invalidate_user_cache(user_id, str(user.org_id))
                 logger.debug("- User ID: %s", user_id)
         except Exception as e:
             logger.error("- User ID: %s, Error: %s", user_id, e)
@@ -284,8 +385,55 @@ class UserStoragePostgreSQL:
             if not user:
                 raise ValueError(f"用户不存在: {user_id}")
 
+            org_id = str(user.org_id)
             db.delete(user)
             db.commit()
+            self.invalidate_user_cache(user_id, org_id)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ==================== 批量授权 ====================
+
+    def _grant_accounts_bulk(
+        self, model, user_id: str, account_ids: list[str], granted_by: str
+    ) -> int:
+        """
+        批量授予账号权限（单条 INSERT ... ON CONFLICT DO NOTHING）
+
+        Returns:
+            实际新增的授权数量（已存在的授权被跳过）
+        """
+        # 去重并保持顺序，避免同一条 INSERT 内出现重复键
+        account_ids = list(dict.fromkeys(account_ids))
+        if not account_ids:
+            return 0
+
+        now = _utc_now()
+        stmt = (
+            pg_insert(model)
+            .values(
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "account_id": account_id,
+                        "granted_by": granted_by,
+                        "created_at": now,
+                    }
+                    for account_id in account_ids
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "account_id"])
+        )
+
+        db = self._get_db()
+        try:
+            result = db.execute(stmt)
+            db.commit()
+            return result.rowcount
         except Exception:
             db.rollback()
             raise
@@ -325,6 +473,12 @@ class UserStoragePostgreSQL:
         finally:
             db.close()
 
+    def grant_aws_accounts_bulk(
+        self, user_id: str, account_ids: list[str], granted_by: str
+    ) -> int:
+        """批量授予 AWS 账号权限，返回新增数量"""
+        return self._grant_accounts_bulk(AWSAccountPermission, user_id, account_ids, granted_by)
+
     def revoke_aws_account(self, user_id: str, account_id: str):
         """撤销 AWS 账号权限"""
         db = self._get_db()
@@ -391,6 +545,12 @@ class UserStoragePostgreSQL:
         finally:
             db.close()
 
+    def grant_gcp_accounts_bulk(
+        self, user_id: str, account_ids: list[str], granted_by: str
+    ) -> int:
+        """批量授予 GCP 账号权限，返回新增数量"""
+        return self._grant_accounts_bulk(GCPAccountPermission, user_id, account_ids, granted_by)
+
     def revoke_gcp_account(self, user_id: str, account_id: str):
         """撤销 GCP 账号权限"""
         db = self._get_db()
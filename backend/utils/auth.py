@@ -1,5 +1,6 @@
 """认证工具 - JWT生成和验证"""
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -35,6 +36,16 @@ def hash_password(password: str) -> str:
     return hashed.decode("utf-8")
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    异步加密密码
+
+    bcrypt 为 CPU 密集型操作（rounds=12 约数百毫秒），在线程池中执行，
+    避免阻塞事件循环。供 async 端点调用，输出与 hash_password 一致。
+    """
+    return await asyncio.to_thread(hash_password, password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证密码
@@ -219,7 +230,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # 从数据库获取用户
+        # 从数据库获取用户（不走进程内缓存：禁用/删除/降级必须在所有实例上立即生效）
         user_storage = get_user_storage()
         user = user_storage.get_user_by_id(user_id)
         if user is None:
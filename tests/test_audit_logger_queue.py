@@ -0,0 +1,83 @@
+"""审计日志异步批量写入 - 单元测试
+
+覆盖：
+- emit() 入队后由后台线程合并为一次 executemany 写入
+- 整批写入失败时逐条重试，只丢弃无法写入的记录
+- 队列已满时丢弃记录并计数，不在调用方线程同步写库
+"""
+
+from unittest.mock import MagicMock, patch
+
+from backend.services import audit_logger as audit_module
+from backend.services.audit_logger import AuditLogger
+
+
+def _fake_get_db(db):
+    def get_db():
+        yield db
+
+    return get_db
+
+
+def test_emit_batches_rows_into_single_insert():
+    db = MagicMock()
+    audit = AuditLogger()
+
+    with patch.object(audit_module, "get_db", _fake_get_db(db)):
+        # 先入队再启动写入线程，确保三条记录进入同一批
+        with patch.object(audit, "_ensure_writer"):
+            for i in range(3):
+                audit.emit("u1", "o1", "user_create", "user", f"target-{i}")
+        audit._ensure_writer()
+        assert audit.flush(timeout=5)
+
+    db.execute.assert_called_once()
+    rows = db.execute.call_args.args[1]
+    assert [row["resource_id"] for row in rows] == ["target-0", "target-1", "target-2"]
+    db.commit.assert_called_once()
+    assert audit.dropped_count == 0
+
+
+def test_failed_batch_is_retried_row_by_row():
+    db = MagicMock()
+    bad_row_seen = []
+
+    def execute(stmt, rows):
+        if len(rows) > 1:
+            raise RuntimeError("batch failed")
+        if rows[0]["resource_id"] == "bad":
+            bad_row_seen.append(rows[0])
+            raise RuntimeError("bad row")
+
+    db.execute.side_effect = execute
+    audit = AuditLogger()
+    rows = [
+        {"action": "user_create", "resource_id": "ok-1"},
+        {"action": "user_create", "resource_id": "bad"},
+        {"action": "user_create", "resource_id": "ok-2"},
+    ]
+
+    with patch.object(audit_module, "get_db", _fake_get_db(db)):
+        audit._write_batch(rows)
+
+    # 1 次整批 + 3 次逐条
+    assert db.execute.call_count == 4
+    assert db.commit.call_count == 2
+    assert len(bad_row_seen) == 1
+    assert audit.dropped_count == 1
+
+
+def test_full_queue_drops_without_sync_write(monkeypatch):
+    monkeypatch.setattr(audit_module, "AUDIT_QUEUE_MAXSIZE", 2)
+    audit = AuditLogger()
+
+    with (
+        patch.object(audit, "_ensure_writer"),
+        patch.object(audit, "_write_batch") as write_batch,
+    ):
+        for i in range(5):
+            audit.emit("u1", "o1", "permission_grant", "aws_account", f"acc-{i}")
+
+    write_batch.assert_not_called()
+    assert audit._queue.qsize() == 2
+    assert audit.dropped_count == 3
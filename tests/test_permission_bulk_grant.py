@@ -0,0 +1,63 @@
+"""批量授权 - 单元测试
+
+覆盖：
+- 单条 INSERT ... ON CONFLICT (user_id, account_id) DO NOTHING
+- 同一请求内重复的账号ID被去重
+- 返回实际新增数量，空列表不访问数据库
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.models.permission import AWSAccountPermission, GCPAccountPermission
+from backend.services.user_storage_postgresql import UserStoragePostgreSQL
+
+
+def _run_bulk_grant(model, account_ids, rowcount=0):
+    storage = UserStoragePostgreSQL()
+    db = MagicMock()
+    db.execute.return_value.rowcount = rowcount
+
+    with patch.object(storage, "_get_db", return_value=db):
+        granted = storage._grant_accounts_bulk(model, "u1", account_ids, "admin")
+
+    return granted, db
+
+
+def test_bulk_grant_single_insert_on_conflict_do_nothing():
+    granted, db = _run_bulk_grant(AWSAccountPermission, ["a1", "a2", "a1"], rowcount=2)
+
+    assert granted == 2
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+
+    stmt = db.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id, account_id) DO NOTHING" in sql
+
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    account_params = [v for k, v in params.items() if k.startswith("account_id")]
+    assert account_params == ["a1", "a2"]
+
+
+def test_bulk_grant_empty_list_skips_database():
+    storage = UserStoragePostgreSQL()
+
+    with patch.object(storage, "_get_db") as get_db:
+        assert storage.grant_gcp_accounts_bulk("u1", [], "admin") == 0
+
+    get_db.assert_not_called()
+
+
+def test_bulk_grant_rolls_back_on_error():
+    storage = UserStoragePostgreSQL()
+    db = MagicMock()
+    db.execute.side_effect = RuntimeError("boom")
+
+    with patch.object(storage, "_get_db", return_value=db), pytest.raises(RuntimeError):
+        storage._grant_accounts_bulk(GCPAccountPermission, "u1", ["g1"], "admin")
+
+    db.rollback.assert_called_once()
+    db.close.assert_called_once()
@@ -0,0 +1,92 @@
+"""SSE 流式响应生成器 - 单元测试
+
+覆盖：
+- 正常结束时按顺序输出全部帧
+- 客户端断开（在 yield 处 aclose）时正常关闭，并通知业务层取消
+- 有界队列的背压：消费者不读取时生产者不会无限预取
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.api import sse
+from backend.api.sse import SSEQueryRequestV2, sse_query_endpoint_v2
+
+
+class _FakeProvider:
+    """模拟 agent_provider：按需产生事件并记录取消标志"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.produced = 0
+        self.cancel_event: asyncio.Event | None = None
+        self.closed = False
+
+    async def query(self, cancel_event, **kwargs):
+        self.cancel_event = cancel_event
+        try:
+            for i in range(self.count):
+                self.produced += 1
+                yield {"type": "chunk", "index": i}
+                await asyncio.sleep(0)
+        finally:
+            self.closed = True
+
+
+async def _open_stream(provider: _FakeProvider, monkeypatch):
+    # 生成器在迭代时才调用 get_agent_provider，需在整个测试期间保持替换
+    monkeypatch.setattr(sse, "get_agent_provider", lambda: provider)
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    current_user = {"id": "u1", "org_id": "o1", "role": "user", "username": "tester"}
+
+    response = await sse_query_endpoint_v2(
+        request, SSEQueryRequestV2(query="cost"), current_user=current_user
+    )
+    return response.body_iterator
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_all_frames_in_order(monkeypatch):
+    provider = _FakeProvider(count=5)
+    stream = await _open_stream(provider, monkeypatch)
+
+    frames = [frame async for frame in stream]
+
+    indexes = [json.loads(frame[len("data: "):])["index"] for frame in frames]
+    assert indexes == [0, 1, 2, 3, 4]
+    assert not provider.cancel_event.is_set()
+
+
+@pytest.mark.asyncio
+async def test_aclose_at_yield_closes_cleanly_and_cancels_producer(monkeypatch):
+    provider = _FakeProvider(count=1000)
+    stream = await _open_stream(provider, monkeypatch)
+
+    first = await stream.__anext__()
+    assert json.loads(first[len("data: "):])["index"] == 0
+
+    # 模拟客户端断开：生成器停在 yield 处被关闭，不应抛出 BaseExceptionGroup
+    await stream.aclose()
+
+    assert provider.cancel_event.is_set()
+    assert provider.closed
+    assert provider.produced < provider.count
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_applies_backpressure(monkeypatch):
+    provider = _FakeProvider(count=1000)
+    stream = await _open_stream(provider, monkeypatch)
+
+    await stream.__anext__()
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+    # 队列满后生产者在 queue.put 处等待，预取量受队列上限约束
+    assert provider.produced <= sse._SSE_QUEUE_MAXSIZE + 2
+
+    await stream.aclose()
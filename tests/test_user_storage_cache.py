@@ -0,0 +1,118 @@
+"""用户存储缓存 - 单元测试
+
+覆盖：
+- get_user_in_org 命中缓存后不再查库，跨组织访问返回 None
+- 写操作（update_user）主动失效缓存
+- 缓存条目数有上限，写满时清理过期条目 / 淘汰最早条目
+- 认证路径 get_current_user 不读缓存，禁用用户立即失效
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from backend.services import user_storage_postgresql as storage_module
+from backend.services.user_storage_postgresql import UserStoragePostgreSQL
+
+
+def _make_user_row(user_id: str = "u1", org_id: str = "o1", is_active: bool = True):
+    row = MagicMock()
+    row.org_id = org_id
+    row.to_dict.return_value = {
+        "id": user_id,
+        "org_id": org_id,
+        "username": "alice",
+        "is_active": is_active,
+    }
+    return row
+
+
+@pytest.fixture
+def storage():
+    return UserStoragePostgreSQL()
+
+
+def test_get_user_in_org_uses_cache(storage):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = _make_user_row()
+
+    with patch.object(storage, "_get_db", return_value=db):
+        first = storage.get_user_in_org("u1", "o1")
+        second = storage.get_user_in_org("u1", "o1")
+
+    assert first == second
+    assert db.query.call_count == 1
+
+    # 返回副本，调用方修改不影响缓存
+    first["username"] = "mallory"
+    with patch.object(storage, "_get_db", return_value=db):
+        assert storage.get_user_in_org("u1", "o1")["username"] == "alice"
+
+
+def test_get_user_in_org_rejects_other_org_from_cache(storage):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = _make_user_row()
+
+    with patch.object(storage, "_get_db", return_value=db):
+        storage.get_user_in_org("u1", "o1")
+        assert storage.get_user_in_org("u1", "other-org") is None
+
+
+def test_update_user_invalidates_cache(storage):
+    row = _make_user_row()
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = row
+
+    with patch.object(storage, "_get_db", return_value=db):
+        storage.get_user_in_org("u1", "o1")
+        storage._cache_set(storage._org_users_cache, "o1", [{"id": "u1"}])
+
+        storage.update_user("u1", username="bob")
+
+    assert "u1" not in storage._user_cache
+    assert "o1" not in storage._org_users_cache
+
+
+def test_cache_is_bounded(storage, monkeypatch):
+    monkeypatch.setattr(storage_module, "USER_CACHE_MAX_ENTRIES", 3)
+
+    for i in range(5):
+        storage._cache_set(storage._user_cache, f"u{i}", {"id": f"u{i}"})
+
+    assert len(storage._user_cache) == 3
+    # 淘汰最早写入的条目
+    assert list(storage._user_cache) == ["u2", "u3", "u4"]
+
+
+def test_cache_prunes_expired_entries_first(storage, monkeypatch):
+    monkeypatch.setattr(storage_module, "USER_CACHE_MAX_ENTRIES", 2)
+
+    storage._user_cache["stale"] = (0.0, {"id": "stale"})
+    storage._cache_set(storage._user_cache, "fresh", {"id": "fresh"})
+    storage._cache_set(storage._user_cache, "new", {"id": "new"})
+
+    assert set(storage._user_cache) == {"fresh", "new"}
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_bypasses_cache():
+    from backend.utils import auth
+
+    user_storage = MagicMock()
+    user_storage.get_user_by_id.return_value = {
+        "id": "u1",
+        "username": "alice",
+        "is_active": False,
+    }
+    credentials = MagicMock(credentials="token")
+
+    with (
+        patch.object(auth, "decode_access_token", return_value={"sub": "u1"}),
+        patch.object(auth, "get_user_storage", return_value=user_storage),
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await auth.get_current_user(credentials)
+
+    assert exc_info.value.status_code == 403
+    user_storage.get_user_by_id.assert_called_once_with("u1")
@@ -0,0 +1,51 @@
+"""用户创建请求校验 - 单元测试
+
+覆盖预编译正则与原有字符串判断的语义一致：
+- 邮箱格式：恰好一个 @，且 @ 之后包含 .
+- 普通用户名：字母/数字/下划线/连字符，至少包含一个字母或数字
+- 首尾带空白的用户名不做裁剪，按原实现的规则判断
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from backend.api.users import UserCreateRequest
+
+
+def _legacy_is_valid(v: str) -> bool:
+    """原实现（改为正则之前）的判断逻辑"""
+    if "@" in v:
+        return v.count("@") == 1 and "." in v.split("@")[1]
+    return v.replace("_", "").replace("-", "").isalnum()
+
+
+@pytest.mark.parametrize(
+    "username",
+    [
+        "alice@example.com",
+        "a.b+tag@sub.example.co.jp",
+        "@b.1",
+        "user@x.",
+        "user@.x",
+        "a b@c.d",
+        "alice@@example.com",
+        "alice@example",
+        "alice_01",
+        "bob-smith",
+        "用户名",
+        "___",
+        "a-_",
+        "bad name",
+        "bad!name",
+        " alice",
+        "alice@example.com ",
+    ],
+)
+def test_username_validation_matches_legacy_rules(username):
+    try:
+        UserCreateRequest(username=username)
+        accepted = True
+    except ValidationError:
+        accepted = False
+
+    assert accepted == _legacy_is_valid(username)